@@ -1,21 +1,145 @@
-from flask import Flask, render_template, request, jsonify
-from fetch import fetch_data as fetch_api_data
-import sqlite3
+from flask import Flask, Response, g, render_template, request, jsonify, stream_with_context
+from flask.json.provider import DefaultJSONProvider
+from fetch import fetch_data as fetch_api_data, sync_datasets, start_refresh
+import storage
+import loader
+import jobs
+import metrics
+from eda import generate_plots, generate_eda_data, load_libraries as load_eda_libraries, start_plot_pool
+from models import generate_forecasts, generate_batch_forecasts, load_libraries as load_model_libraries
+from evaluators import evaluate_models, iter_fold_metrics, summarize_folds
+import cProfile
+import csv
+import io
 import json
-from eda import generate_plots
-from models import generate_forecasts   # Updated models.py expected
-from evaluators import evaluate_models
+import logging
+import multiprocessing
 import os
+import pstats
+import re
+import threading
+import time
 
 # Disable TensorFlow OneDNN logs
 os.environ["TF_ENABLE_ONEDNN_OPTS"] = "0"
 
+# Configure logging; the analytics modules only log, so importing them configures nothing
+logging.basicConfig(
+    filename="eda.log", level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s"
+)
+
 app = Flask(__name__)
 
+# -------- Warm-up --------
+# Model and plotting libraries are imported on first use, so page and listing routes
+# never load them. Set ANALYTICS_WARM_UP=1 to import them in the background after boot.
+ANALYTICS_WARM_UP = os.environ.get("ANALYTICS_WARM_UP", "").lower() in ("1", "true", "yes")
+
+def warm_up():
+    """Import the analytics libraries on a background thread; returns the thread."""
+    def load():
+        started = time.perf_counter()
+        try:
+            load_model_libraries()
+            load_eda_libraries()
+            start_plot_pool()
+            logging.info(f"Analytics libraries loaded in {time.perf_counter() - started:.2f}s")
+        except Exception as e:
+            logging.warning(f"Analytics warm-up failed: {e}")
+
+    thread = threading.Thread(target=load, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+# Model and plot worker processes re-import this module; only the server process warms up
+if ANALYTICS_WARM_UP and multiprocessing.parent_process() is None:
+    warm_up()
+
+# -------- Scheduled Refresh --------
+# REFRESH_SOURCES points to a JSON file of {dataset_name: api_url}; those datasets are
+# synced incrementally every REFRESH_INTERVAL seconds.
+REFRESH_SOURCES = os.environ.get("REFRESH_SOURCES")
+REFRESH_INTERVAL = float(os.environ.get("REFRESH_INTERVAL", 300))
+
+# Worker processes re-import this module; only the server process runs the refresh thread
+if REFRESH_SOURCES and multiprocessing.parent_process() is None:
+    start_refresh(REFRESH_SOURCES, REFRESH_INTERVAL)
+
 # Ensure necessary folders exist
 os.makedirs("templates", exist_ok=True)
 os.makedirs("static", exist_ok=True)
 
+# -------- Instrumentation --------
+# Every request collects timing spans (data load, parse, preprocess, model fit/predict,
+# plot render, serialization). The per-stage breakdown is returned in a Server-Timing
+# header and logged; aggregates are served at /metrics. With PROFILING_ENABLED=1,
+# adding profile=1 to a request runs it under cProfile and writes a report to PROFILE_DIR.
+PROFILING_ENABLED = os.environ.get("PROFILING_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILE_DIR = "profiles"
+
+class TimedJSONProvider(DefaultJSONProvider):
+    def dumps(self, obj, **kwargs):
+        with metrics.span("serialize"):
+            return super().dumps(obj, **kwargs)
+
+app.json = TimedJSONProvider(app)
+
+def runtime_metrics():
+    """Cache and job-queue state, read when /metrics is scraped."""
+    cache = loader.cache_stats()
+    return [
+        ("cache_hits_total", "counter", "Dataset cache hits", [({}, cache["hits"])]),
+        ("cache_misses_total", "counter", "Dataset cache misses", [({}, cache["misses"])]),
+        ("cache_evictions_total", "counter", "Dataset cache evictions", [({}, cache["evictions"])]),
+        ("cache_invalidations_total", "counter", "Dataset cache invalidations", [({}, cache["invalidations"])]),
+        ("cache_entries", "gauge", "Cached dataset versions", [({}, cache["entries"])]),
+        ("cache_bytes", "gauge", "Memory held by cached datasets", [({}, cache["bytes"])]),
+        ("jobs", "gauge", "Known background jobs by status",
+         [({"status": status}, count) for status, count in jobs.job_stats().items()]),
+    ]
+
+metrics.register_collector(runtime_metrics)
+
+def write_profile(profiler, route):
+    """Dump a request's cProfile data (.prof) and a cumulative-time report (.txt); returns the report path."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = re.sub(r"[^A-Za-z0-9_-]+", "_", route.strip("/")) or "home"
+    base = os.path.join(PROFILE_DIR, f"{time.strftime('%Y%m%d-%H%M%S')}-{name}")
+    profiler.dump_stats(f"{base}.prof")
+    with open(f"{base}.txt", "w") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+    return f"{base}.txt"
+
+@app.before_request
+def start_request():
+    g.request_started = time.perf_counter()
+    metrics.start_trace()
+    if PROFILING_ENABLED and request.args.get("profile", "").lower() in ("1", "true", "yes"):
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+@app.after_request
+def finish_request(response):
+    elapsed = time.perf_counter() - g.get("request_started", time.perf_counter())
+    route = request.url_rule.rule if request.url_rule else "unmatched"
+    spans = metrics.summarize(metrics.end_trace())
+    metrics.observe("request_seconds", elapsed, "HTTP request latency",
+                    route=route, method=request.method, status=response.status_code)
+
+    timing = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in spans.items()]
+    response.headers["Server-Timing"] = ", ".join(timing + [f"total;dur={elapsed * 1000:.1f}"])
+    logging.info(json.dumps({
+        "event": "request", "route": route, "method": request.method, "status": response.status_code,
+        "seconds": round(elapsed, 4), "spans": {name: round(seconds, 4) for name, seconds in spans.items()},
+    }))
+
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        response.headers["X-Profile"] = write_profile(profiler, route)
+    return response
+
 # -------- Page Routes --------
 @app.route("/")
 def home():
@@ -49,37 +173,103 @@ def view_table_page():
     return render_template("table.html", dataset_name=dataset_name)
 
 # -------- API Routes --------
+def wants_async(data):
+    """True when the client asked for a background job instead of a blocking response."""
+    return data.get("async", "").lower() in ("1", "true", "yes")
+
+def submit_job(kind, func, *args, **kwargs):
+    try:
+        job = jobs.submit(kind, func, *args, **kwargs)
+    except jobs.QueueFullError as e:
+        return jsonify({"error": str(e)}), 503
+    return jsonify({"job_id": job["id"], "status": job["status"]}), 202
+
+def rollup_options(data):
+    """
+    Optional `resolution` (hour/day/week) and `aggregate` fields, as keyword arguments
+    for the EDA, forecast and evaluation functions. Raises ValueError for unknown values.
+    """
+    resolution = data.get("resolution") or None
+    aggregate = data.get("aggregate") or None
+    if resolution not in (None, *storage.ROLLUP_RESOLUTIONS):
+        raise ValueError(f"Resolution must be one of: {', '.join(storage.ROLLUP_RESOLUTIONS)}.")
+    if aggregate not in (None, *storage.ROLLUP_AGGREGATES):
+        raise ValueError(f"Aggregate must be one of: {', '.join(storage.ROLLUP_AGGREGATES)}.")
+    return {"resolution": resolution, "aggregate": aggregate}
+
+PAGE_SIZE = 500  # Default rows per /api/get_dataset page
+MAX_PAGE_SIZE = 5000
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
 @app.route("/api/get_dataset")
 def api_get_dataset():
-    dataset_name = request.args.get('dataset_name')
+    """
+    One page of a dataset, or a streamed export of it.
+
+    Query parameters: `columns` (comma-separated projection), `start`/`end` (inclusive
+    timestamp range), `after` (keyset cursor: the `next_after` of the previous page),
+    `limit` (page size) and `format` (`json` page, or `ndjson`/`csv` streamed export of
+    the whole range).
+    """
+    args = request.args
+    dataset_name = args.get('dataset_name')
 
     if not dataset_name:
         return jsonify({"error": "Dataset name is missing."}), 400
 
-    conn = sqlite3.connect("data_storage.db")
-    cursor = conn.cursor()
-
-    cursor.execute("SELECT timestamp, data FROM timeseries_data WHERE dataset_name = ?", (dataset_name,))
-    rows = cursor.fetchall()
-
-    cursor.execute("SELECT keys FROM timeseries_data WHERE dataset_name = ? LIMIT 1", (dataset_name,))
-    keys_row = cursor.fetchone()
-    conn.close()
-
-    if not rows or not keys_row:
-        return jsonify({"keys": [], "rows": []})
-
-    keys = json.loads(keys_row[0])
-    if "timestamp" not in keys:
-        keys.insert(0, "timestamp")
-
-    table_rows = []
-    for timestamp, data_json in rows:
-        row_data = json.loads(data_json)
-        row_data["timestamp"] = timestamp
-        table_rows.append(row_data)
-
-    return jsonify({"keys": keys, "rows": table_rows})
+    fmt = args.get("format", "json").lower()
+    if fmt != "json" and fmt not in EXPORT_FORMATS:
+        return jsonify({"error": "Format must be 'json', 'ndjson' or 'csv'."}), 400
+    try:
+        limit = int(args["limit"]) if args.get("limit") else None
+    except ValueError:
+        return jsonify({"error": "Limit must be an integer."}), 400
+    if limit is not None and limit < 1:
+        return jsonify({"error": "Limit must be positive."}), 400
+
+    info = storage.get_dataset_info(dataset_name)
+    if info is None:
+        return jsonify({"keys": [], "rows": [], "next_after": None})
+
+    columns = [name.strip() for name in args["columns"].split(",")] if args.get("columns") else None
+    keys = storage.projected_columns(info, columns)
+    filters = {"start": args.get("start") or None, "end": args.get("end") or None, "after": args.get("after") or None}
+
+    if fmt in EXPORT_FORMATS:
+        chunks = storage.iter_chunks(dataset_name, columns=columns, limit=limit, **filters)
+
+        def generate():
+            if fmt == "csv":
+                buffer = io.StringIO()
+                writer = csv.writer(buffer)
+                writer.writerow(keys)
+                for rows in chunks:
+                    writer.writerows(rows)
+                    yield buffer.getvalue()
+                    buffer.seek(0)
+                    buffer.truncate()
+                yield buffer.getvalue()
+            else:
+                for rows in chunks:
+                    yield "".join(json.dumps(dict(zip(keys, row))) + "\n" for row in rows)
+
+        headers = {"Content-Disposition": f'attachment; filename="{dataset_name}.{fmt}"'}
+        return Response(stream_with_context(generate()), mimetype=EXPORT_FORMATS[fmt], headers=headers)
+
+    # Fetch one extra row to know whether another page follows
+    limit = min(limit or PAGE_SIZE, MAX_PAGE_SIZE)
+    chunks = storage.iter_chunks(dataset_name, columns=columns, limit=limit + 1, chunksize=limit + 1, **filters)
+    rows = next(chunks, [])
+    chunks.close()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    return jsonify({
+        "keys": keys,
+        "rows": [dict(zip(keys, row)) for row in rows],
+        "limit": limit,
+        "next_after": rows[-1][0] if has_more else None,
+    })
 
 @app.route("/fetch", methods=["POST"])
 def fetch_data_endpoint():
@@ -90,9 +280,24 @@ def fetch_data_endpoint():
     if not api_url or not dataset_name:
         return jsonify({"error": "API URL and Dataset Name are required."}), 400
 
-    result = fetch_api_data(api_url, dataset_name)
+    # incremental=1 stores only rows newer than the dataset's latest timestamp
+    incremental = data.get("incremental", "").lower() in ("1", "true", "yes", "on")
+    result = fetch_api_data(api_url, dataset_name, incremental=incremental)
     return jsonify(result)
 
+@app.route("/sync", methods=["POST"])
+def sync_endpoint():
+    payload = request.get_json(silent=True) or {}
+    sources = payload.get("sources")
+
+    if not isinstance(sources, dict) or not sources:
+        return jsonify({"error": "A mapping of dataset names to API URLs is required."}), 400
+
+    if payload.get("async"):
+        return submit_job("sync", sync_datasets, sources)
+
+    return jsonify(sync_datasets(sources))
+
 @app.route("/eda", methods=["POST"])
 def eda():
     data = request.form
@@ -104,7 +309,20 @@ def eda():
     if not dataset_name:
         return jsonify({"error": "Dataset Name is required."}), 400
 
-    result = generate_plots(dataset_name, dependent_col, moving_avg_window, heatmap_window)
+    # mode=data returns downsampled arrays for client-side charts instead of PNG plots
+    mode = data.get("mode", "plots")
+    if mode not in ("plots", "data"):
+        return jsonify({"error": "Mode must be 'plots' or 'data'."}), 400
+    func = generate_eda_data if mode == "data" else generate_plots
+    try:
+        options = rollup_options(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if wants_async(data):
+        return submit_job(f"eda_{mode}", func, dataset_name, dependent_col, moving_avg_window, heatmap_window, **options)
+
+    result = func(dataset_name, dependent_col, moving_avg_window, heatmap_window, **options)
     return jsonify(result)
 
 # -------- Updated Forecast Endpoint --------
@@ -118,15 +336,55 @@ def forecast():
     if not dataset_name or not dependent_col or not steps:
         return jsonify({"error": "Dataset Name, Dependent Column, and Steps are required."}), 400
 
+    # Optional tree-model settings; None keeps the defaults in models.py
+    strategy = data.get("strategy") or None
+    if strategy not in (None, "recursive", "direct"):
+        return jsonify({"error": "Strategy must be 'recursive' or 'direct'."}), 400
+    calendar = data.get("calendar_features")
+    intervals = data.get("intervals")
+    options = {
+        "strategy": strategy,
+        "calendar": calendar.lower() in ("1", "true", "yes") if calendar else None,
+        "intervals": intervals.lower() in ("1", "true", "yes") if intervals else None,
+    }
+
+    # Optional ARIMA/SARIMA order search; None keeps models.ORDER_SEARCH
+    order_search = data.get("order_search") or None
+    if order_search not in (None, "stepwise", "grid"):
+        return jsonify({"error": "Order search must be 'stepwise' or 'grid'."}), 400
+    options["order_search"] = order_search
+
+    try:
+        options.update(rollup_options(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
     try:
         steps = int(steps)
-        forecast_result = generate_forecasts(dataset_name, dependent_col, steps)
+        if wants_async(data):
+            return submit_job("forecast", generate_forecasts, dataset_name, dependent_col, steps, **options)
+
+        forecast_result = generate_forecasts(dataset_name, dependent_col, steps, **options)
         print(forecast_result)
         return jsonify(forecast_result)
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
+@app.route("/forecast/batch", methods=["POST"])
+def forecast_batch():
+    payload = request.get_json(silent=True) or {}
+    specs = payload.get("specs")
+
+    if not isinstance(specs, list) or not specs or not all(isinstance(spec, dict) for spec in specs):
+        return jsonify({"error": "A non-empty list of forecast specs is required."}), 400
+
+    store = bool(payload.get("store"))
+    if payload.get("async"):
+        return submit_job("forecast_batch", generate_batch_forecasts, specs, store=store)
+
+    return jsonify(generate_batch_forecasts(specs, store=store))
+
 @app.route("/evaluate", methods=["POST"])
 def evaluate():
     data = request.form
@@ -136,15 +394,72 @@ def evaluate():
     if not dataset_name or not dependent_col:
         return jsonify({"error": "Dataset Name and Dependent Column are required."}), 400
 
-    result = evaluate_models(dataset_name, dependent_col)
+    # Backtest settings: number of folds and expanding/sliding training window
+    window = data.get("window") or None
+    if window not in (None, "expanding", "sliding"):
+        return jsonify({"error": "Window must be 'expanding' or 'sliding'."}), 400
+    try:
+        folds = int(data["folds"]) if data.get("folds") else None
+        window_size = int(data["window_size"]) if data.get("window_size") else None
+    except ValueError:
+        return jsonify({"error": "Folds and window size must be integers."}), 400
+    options = {"folds": folds, "window": window, "window_size": window_size}
+    try:
+        options.update(rollup_options(data))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if data.get("stream", "").lower() in ("1", "true", "yes"):
+        # NDJSON: one line per completed fold, then the ranked summary
+        def generate():
+            fold_results = []
+            try:
+                for fold in iter_fold_metrics(dataset_name, dependent_col, **options):
+                    fold_results.append(fold)
+                    yield json.dumps(fold) + "\n"
+                yield json.dumps(summarize_folds(fold_results)) + "\n"
+            except ValueError as e:
+                yield json.dumps({"error": str(e)}) + "\n"
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+    if wants_async(data):
+        return submit_job("evaluate", evaluate_models, dataset_name, dependent_col, **options)
+
+    result = evaluate_models(dataset_name, dependent_col, **options)
     return jsonify(result)
 
+@app.route("/jobs/<job_id>")
+def job_status(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Unknown or expired job id."}), 404
+    return jsonify(job)
+
 @app.route("/list_datasets")
 def list_datasets():
     from fetch import list_datasets_from_db
     datasets = list_datasets_from_db()
     return jsonify({"datasets": datasets})
 
+@app.route("/api/dataset_info")
+def api_dataset_info():
+    dataset_name = request.args.get('dataset_name')
+    if not dataset_name:
+        return jsonify({"datasets": storage.list_catalog()})
+
+    info = storage.get_dataset_info(dataset_name)
+    if info is None:
+        return jsonify({"error": f"Dataset '{dataset_name}' not found."}), 404
+    return jsonify(info)
+
+@app.route("/api/cache_stats")
+def api_cache_stats():
+    return jsonify(loader.cache_stats())
+
+@app.route("/metrics")
+def metrics_endpoint():
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
 # -------- App Runner --------
 if __name__ == "__main__":
 
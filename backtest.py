@@ -0,0 +1,138 @@
+import functools
+import logging
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+import models
+
+# ---------------------- CONFIG ----------------------
+BACKTEST_FOLDS = 5
+BACKTEST_WINDOW = "expanding"  # "expanding" or "sliding"
+REFIT_EVERY = 5  # ARIMA/SARIMA re-estimate parameters once per this many adjacent folds
+MIN_TRAIN_SIZE = 30
+
+
+# ---------------------- FOLDS ----------------------
+def make_folds(n, folds, horizon, window="expanding", window_size=None):
+    """
+    Rolling-origin folds over a series of length n, as (fold, train_start, origin).
+
+    Each fold trains on [train_start, origin) and is scored on the next `horizon`
+    points; origins are `horizon` apart and the last fold ends at the end of the series.
+    Sliding windows keep `window_size` training points (default: the first fold's size).
+    """
+    origins = [n - horizon * (folds - k) for k in range(folds)]
+    origins = [origin for origin in origins if origin >= MIN_TRAIN_SIZE]
+    if not origins:
+        return []
+
+    if window == "sliding":
+        size = window_size or origins[0]
+        return [(k, max(0, origin - size), origin) for k, origin in enumerate(origins)]
+    return [(k, 0, origin) for k, origin in enumerate(origins)]
+
+
+# ---------------------- WORKERS ----------------------
+def _state_space_segment(model_name, values, segment, horizon, options=None):
+    """
+    Evaluate adjacent folds of one ARIMA/SARIMA model, estimating parameters once at
+    the first origin and re-filtering the later windows with them.
+    """
+    build, fit_kwargs = models.STATE_SPACE_MODELS[model_name]
+    build = functools.partial(build, **(options or {}))
+    results, params = [], None
+    for fold, start, origin in segment:
+        try:
+            train = values[start:origin]
+            if params is None:
+                fitted = build(train).fit(**fit_kwargs)
+                params = fitted.params
+            else:
+                fitted = build(train).filter(params)
+            results.append((fold, np.asarray(fitted.forecast(horizon), dtype=float).tolist(), None))
+        except Exception as e:
+            logging.error(f"{model_name} backtest fold {fold} error: {e}")
+            results.append((fold, None, f"{model_name} failed"))
+    return results
+
+
+def _tree_fold(model_name, train_df, dependent_col, fold, horizon):
+    forecast = models.FORECAST_MODELS[model_name](train_df, dependent_col, horizon, intervals=False)
+    if isinstance(forecast, dict):
+        return [(fold, None, forecast.get("error", f"{model_name} failed"))]
+    return [(fold, [entry["forecast"] for entry in forecast], None)]
+
+
+# ---------------------- ENGINE ----------------------
+def iter_backtest(df, dependent_col, folds=None, horizon=10, window=None, window_size=None,
+                  model_names=None, executor=None, refit_every=None):
+    """
+    Walk-forward backtest of the forecasting models over `df`.
+
+    Yields one dict per (model, fold) as soon as it is available, with the fold's
+    origin, forecast and actual values (or an error). Folds run in parallel; for
+    ARIMA/SARIMA, blocks of `refit_every` adjacent folds share one parameter estimate.
+    """
+    folds = folds or BACKTEST_FOLDS
+    window = window or BACKTEST_WINDOW
+    refit_every = refit_every or REFIT_EVERY
+    model_names = model_names or list(models.FORECAST_MODELS)
+    executor = executor or models.FORECAST_EXECUTOR
+
+    values = df[dependent_col].to_numpy(dtype=float)
+    fold_list = make_folds(len(values), folds, horizon, window, window_size)
+    origins = {fold: (start, origin) for fold, start, origin in fold_list}
+
+    jobs = []  # (model name, fold ids, worker, args)
+    # SARIMA's season is detected on the first training window, so no fold sees its test data
+    seasonal = None
+    if fold_list and "SARIMA" in model_names:
+        seasonal = {"seasonal_order": models.detect_seasonal_order(values[:fold_list[0][2]])}
+
+    for name in model_names:
+        if name in models.STATE_SPACE_MODELS:
+            options = seasonal if name == "SARIMA" else None
+            for i in range(0, len(fold_list), refit_every):
+                segment = fold_list[i:i + refit_every]
+                jobs.append((name, [f[0] for f in segment], _state_space_segment,
+                             (name, values, segment, horizon, options)))
+        else:
+            for fold, start, origin in fold_list:
+                train_df = df.iloc[start:origin].reset_index(drop=True)
+                jobs.append((name, [fold], _tree_fold, (name, train_df, dependent_col, fold, horizon)))
+
+    def _emit(name, fold_results):
+        for fold, forecast, error in fold_results:
+            start, origin = origins[fold]
+            yield {
+                "model": name,
+                "fold": fold,
+                "train_start": start,
+                "origin": origin,
+                "forecast": forecast,
+                "actual": values[origin:origin + horizon].tolist(),
+                "error": error,
+            }
+
+    if executor == "serial" or len(jobs) <= 1:
+        for name, _, func, args in jobs:
+            yield from _emit(name, func(*args))
+        return
+
+    workers = max(1, min(models.MAX_WORKERS, len(jobs)))
+    if executor == "thread":
+        pool = ThreadPoolExecutor(max_workers=workers)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=models.process_context())
+
+    with pool:
+        futures = {pool.submit(func, *args): (name, fold_ids) for name, fold_ids, func, args in jobs}
+        for future in as_completed(futures):
+            name, fold_ids = futures[future]
+            try:
+                fold_results = future.result()
+            except Exception as e:
+                logging.error(f"{name} backtest worker error: {e}")
+                fold_results = [(fold, None, f"{name} failed") for fold in fold_ids]
+            yield from _emit(name, fold_results)
@@ -0,0 +1,263 @@
+"""
+End-to-end benchmarks for ingest, loading, EDA, forecasting and evaluation.
+
+Each size gets a fresh database filled with a deterministic synthetic series, and
+every stage is timed against it; the peak memory of a cold single-column load is
+checked against a bound. Results are written as JSON; with --baseline the run is
+compared to an earlier results file and regressions are reported.
+
+    python benchmark.py --sizes 1000,100000 --output bench.json
+    python benchmark.py --sizes 1000,100000 --baseline bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+import storage
+import loader
+import registry
+import fetch
+import eda
+import models
+import evaluators
+
+# ---------------------- CONFIG ----------------------
+SIZES = (1_000, 100_000, 1_000_000, 10_000_000)
+DATASET = "bench"
+COLUMN = "value"
+FREQ = "5min"
+SLOW_STAGE_MAX_ROWS = 20_000  # EDA, model fits and evaluation are skipped above this size by default
+REGRESSION_THRESHOLD = 1.25  # A stage regresses when it takes this many times its baseline...
+REGRESSION_MIN_SECONDS = 0.05  # ...and at least this much longer in absolute terms
+LOAD_PEAK_BASE_BYTES = 8 * 1024 * 1024  # Peak memory bound of a cold single-column load: this allowance...
+LOAD_PEAK_FACTOR = 1.5  # ...plus this multiple of the loaded frame's size
+
+
+# ---------------------- SYNTHETIC DATA ----------------------
+def make_series(n, seed=0, freq=FREQ, gap_fraction=0.01, duplicate_fraction=0.005):
+    """
+    Deterministic synthetic series of about n rows with 'timestamp', 'value' and 'volume'.
+
+    The value is a linear trend plus daily and weekly seasonality and Gaussian noise.
+    About `gap_fraction` of the timestamps are missing (in runs, like feed outages) and
+    `duplicate_fraction` of the rows repeat an earlier timestamp with a revised value,
+    as re-delivered API bars do.
+    """
+    rng = np.random.default_rng(seed)
+    ts = pd.date_range("2020-01-01", periods=n, freq=freq)
+    t = np.arange(n, dtype=float)
+    steps_per_day = pd.Timedelta("1D") / pd.Timedelta(freq)
+
+    value = (
+        100 + 0.001 * t
+        + 5 * np.sin(2 * np.pi * t / steps_per_day)
+        + 2 * np.sin(2 * np.pi * t / (7 * steps_per_day))
+        + rng.normal(0, 1, n)
+    )
+    volume = rng.integers(100, 10_000, n).astype(float)
+
+    # Gaps: drop runs of up to 20 consecutive rows
+    keep = np.ones(n, dtype=bool)
+    for start in rng.integers(0, n, max(1, int(n * gap_fraction / 10))):
+        keep[start:start + rng.integers(1, 21)] = False
+
+    df = pd.DataFrame({"timestamp": ts[keep], "value": value[keep], "volume": volume[keep]})
+
+    # Duplicates: re-deliver some rows with a revised value
+    dupes = df.sample(frac=duplicate_fraction, random_state=seed).copy()
+    dupes["value"] += rng.normal(0, 0.1, len(dupes))
+    df = pd.concat([df, dupes], ignore_index=True)
+
+    df["timestamp"] = df["timestamp"].dt.strftime("%Y-%m-%d %H:%M:%S")
+    return df
+
+
+# ---------------------- TIMING ----------------------
+def timed(func, *args, repeat=1, setup=None, **kwargs):
+    """Best wall time in seconds over `repeat` runs of func; `setup` runs untimed before each."""
+    best = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        func(*args, **kwargs)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return round(best, 4)
+
+
+def peak_bytes(func, *args, setup=None, **kwargs):
+    """(result, peak traced Python/NumPy allocation in bytes) of one run of func."""
+    if setup:
+        setup()
+    tracemalloc.start()
+    try:
+        result = func(*args, **kwargs)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return result, peak
+
+
+def _cold():
+    loader.clear()
+
+
+def _clear_plots():
+    loader.clear()
+    shutil.rmtree(eda.PLOT_DIR, ignore_errors=True)
+
+
+def bench_size(n, workdir, repeat=1, slow_max_rows=SLOW_STAGE_MAX_ROWS, seed=0):
+    """Time every stage on a fresh database of n synthetic rows; returns {stage: seconds or {"skipped": ...}}."""
+    storage.DATABASE_NAME = os.path.join(workdir, f"bench_{n}.db")
+    eda.PLOT_DIR = os.path.join(workdir, "plots")
+    registry.REGISTRY_DIR = os.path.join(workdir, "model_registry")
+    if os.path.exists(storage.DATABASE_NAME):
+        os.remove(storage.DATABASE_NAME)
+    loader.clear()
+
+    df = make_series(n, seed=seed)
+    keys = df.columns.tolist()
+    results = {"rows": len(df)}
+
+    # Ingest into an empty dataset, then re-ingest the same rows (all upserts)
+    results["store_data"] = timed(fetch.store_data, DATASET, df, keys)
+    results["store_data_upsert"] = timed(fetch.store_data, DATASET, df, keys, repeat=repeat)
+
+    results["load_eda"] = timed(eda.fetch_data_from_db, DATASET, repeat=repeat, setup=_cold)
+    results["load_models"] = timed(models.fetch_data, DATASET, COLUMN, repeat=repeat, setup=_cold)
+    results["load_evaluators"] = timed(evaluators.fetch_actual_values, DATASET, COLUMN, repeat=repeat, setup=_cold)
+    results["load_cached"] = timed(models.fetch_data, DATASET, COLUMN, repeat=repeat)
+    results["load_rollup_hour"] = timed(models.fetch_data, DATASET, COLUMN, "hour", repeat=repeat, setup=_cold)
+
+    # Cold single-column load: peak memory should stay within the result plus one read chunk
+    series, peak = peak_bytes(loader.load_series, DATASET, COLUMN, setup=_cold)
+    frame_bytes = int(series.memory_usage(deep=True).sum())
+    bound = int(LOAD_PEAK_BASE_BYTES + LOAD_PEAK_FACTOR * frame_bytes)
+    results["memory"] = {
+        "load_series_peak_bytes": peak,
+        "load_series_frame_bytes": frame_bytes,
+        "peak_bytes_per_row": round(peak / max(1, len(series)), 1),
+        "bound_bytes": bound,
+        "within_bound": peak <= bound,
+    }
+
+    slow = n <= slow_max_rows
+    skipped = {"skipped": f"more than {slow_max_rows} rows"}
+
+    results["eda_generate_plots"] = (
+        timed(eda.generate_plots, DATASET, COLUMN, repeat=repeat, setup=_clear_plots) if slow else skipped
+    )
+    results["eda_generate_plots_cached"] = timed(eda.generate_plots, DATASET, COLUMN, repeat=repeat) if slow else skipped
+
+    series = models.fetch_data(DATASET, COLUMN)
+    for name, forecast in models.FORECAST_MODELS.items():
+        results[f"model_{name}"] = timed(forecast, series, COLUMN, 10, repeat=repeat) if slow else skipped
+
+    results["evaluate_models"] = timed(evaluators.evaluate_models, DATASET, COLUMN, repeat=repeat) if slow else skipped
+    return results
+
+
+# ---------------------- BASELINE ----------------------
+def compare(results, baseline, threshold=REGRESSION_THRESHOLD, min_seconds=REGRESSION_MIN_SECONDS):
+    """
+    Per-stage comparison against a baseline results file.
+
+    Returns a list of {"size", "stage", "seconds", "baseline", "ratio", "regression"}
+    for every stage timed in both runs.
+    """
+    rows = []
+    for size, stages in results["results"].items():
+        base_stages = baseline.get("results", {}).get(size, {})
+        for stage, seconds in stages.items():
+            base = base_stages.get(stage)
+            if stage == "rows" or not isinstance(seconds, (int, float)) or not isinstance(base, (int, float)):
+                continue
+            ratio = seconds / base if base else float("inf")
+            rows.append({
+                "size": size, "stage": stage, "seconds": seconds, "baseline": base,
+                "ratio": round(ratio, 3),
+                "regression": ratio > threshold and seconds - base > min_seconds,
+            })
+    return rows
+
+
+def run(sizes=SIZES, repeat=1, slow_max_rows=SLOW_STAGE_MAX_ROWS, seed=0):
+    """Benchmark every size in a scratch directory; returns the results document."""
+    workdir = tempfile.mkdtemp(prefix="tsa-bench-")
+    original = (storage.DATABASE_NAME, eda.PLOT_DIR, registry.REGISTRY_DIR)
+    try:
+        results = {}
+        for n in sizes:
+            print(f"\n⏱  Benchmarking {n} rows")
+            results[str(n)] = bench_size(n, workdir, repeat=repeat, slow_max_rows=slow_max_rows, seed=seed)
+            print(json.dumps(results[str(n)], indent=2))
+    finally:
+        storage.DATABASE_NAME, eda.PLOT_DIR, registry.REGISTRY_DIR = original
+        loader.clear()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "forecast_executor": models.FORECAST_EXECUTOR,
+            "float_dtype": loader.FLOAT_DTYPE,
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark ingest, loading, EDA, forecasting and evaluation.")
+    parser.add_argument("--sizes", default=",".join(str(n) for n in SIZES),
+                        help="Comma-separated row counts (default: %(default)s)")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per stage; the best time is kept")
+    parser.add_argument("--slow-max-rows", type=int, default=SLOW_STAGE_MAX_ROWS,
+                        help="Largest size for EDA, model and evaluation stages")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    sizes = [int(size) for size in args.sizes.split(",") if size]
+    document = run(sizes, repeat=args.repeat, slow_max_rows=args.slow_max_rows, seed=args.seed)
+
+    regressions = []
+    for size, stages in document["results"].items():
+        memory = stages["memory"]
+        if not memory["within_bound"]:
+            regressions.append(memory)
+            print(f"\nMEMORY: {size} rows peaked at {memory['load_series_peak_bytes']} bytes "
+                  f"(bound {memory['bound_bytes']})")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            comparison = compare(document, json.load(f), threshold=args.threshold)
+        document["comparison"] = comparison
+        regressions += [row for row in comparison if row["regression"]]
+        print("\nstage                          size        seconds   baseline   ratio")
+        for row in comparison:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['stage']:<30} {row['size']:>9} {row['seconds']:>10.4f} {row['baseline']:>10.4f} {row['ratio']:>7.2f}{flag}")
+
+    with open(args.output, "w") as f:
+        json.dump(document, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,50 @@
+import numpy as np
+
+
+# ---------------------- LTTB ----------------------
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Returns the indices of `threshold` points of (x, y) that preserve the visual shape
+    of the series: the first and last points, plus one point per bucket chosen to
+    maximise the triangle it forms with the previously kept point and the next
+    bucket's average. Series already at or below the threshold are returned whole.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket b covers [edges[b], edges[b + 1]) for the threshold - 2 inner buckets
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+
+    # Averages of every bucket (and of the final point) from prefix sums, computed once
+    cx, cy = np.concatenate(([0.0], np.cumsum(x))), np.concatenate(([0.0], np.cumsum(y)))
+    starts = np.append(edges[1:-1], n - 1)
+    ends = np.append(edges[2:], n)
+    avg_x = (cx[ends] - cx[starts]) / (ends - starts)
+    avg_y = (cy[ends] - cy[starts]) / (ends - starts)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for b in range(threshold - 2):
+        lo, hi = edges[b], edges[b + 1]
+        ax, ay = x[a], y[a]
+        area = np.abs((ax - avg_x[b]) * (y[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y[b] - ay))
+        a = lo + int(np.argmax(area))
+        selected[b + 1] = a
+    return selected
+
+
+def downsample(x, y, threshold):
+    """(x, y) reduced to at most `threshold` points with LTTB, ignoring NaN values."""
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    mask = ~np.isnan(y)
+    x, y = x[mask], y[mask]
+    idx = lttb(x, y, threshold)
+    return x[idx], y[idx]
@@ -1,59 +1,57 @@
+import numpy as np
 import pandas as pd
-import sqlite3
+import hashlib
+import importlib
 import json
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for Flask
-
-import matplotlib.pyplot as plt
-import seaborn as sns
-from statsmodels.tsa.seasonal import seasonal_decompose
-from statsmodels.tsa.stattools import adfuller
 import logging
+import multiprocessing
 import os
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import loader
+import metrics
+import seasonality
+import storage
+from downsample import downsample
+
+# matplotlib, seaborn and statsmodels are imported on first use so that importing this
+# module (and the web app) stays fast; load_libraries() imports them ahead of time.
+RENDER_LIBRARIES = ("matplotlib.figure", "seaborn")
+EDA_LIBRARIES = (*RENDER_LIBRARIES, "statsmodels.tsa.stattools")
 
-# Configure logging
-logging.basicConfig(
-    filename="eda.log", level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
-DATABASE_NAME = "data_storage.db"
 PLOT_DIR = "static/plots"
+PLOT_CACHE_MAX_BYTES = 256 * 1024 * 1024  # Total size of cached plots before eviction
+PLOT_MAX_AGE = 7 * 24 * 3600  # Seconds since last use before a cached plot is deleted
+EDA_POINTS = 2000  # Target points per series in data mode (LTTB downsampling)
+ADF_MAX_POINTS = 5000  # Data mode runs the ADF test on at most this many recent points
+# Figure rendering: "process", "thread" or "serial" (the default on a single core, where a pool only adds overhead)
+PLOT_EXECUTOR = os.environ.get("PLOT_EXECUTOR") or ("process" if (os.cpu_count() or 1) > 1 else "serial")
+PLOT_WORKERS = min(4, os.cpu_count() or 1)  # One per figure type at most
+FALLBACK_PERIOD = 30  # Decomposition period when no seasonality is detected (capped at half the series)
 
-# Ensure plot directory exists
-os.makedirs(PLOT_DIR, exist_ok=True)
+DAY_NAMES = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTH_NAMES = ["January", "February", "March", "April", "May", "June", "July",
+               "August", "September", "October", "November", "December"]
 
-def fetch_data_from_db(dataset_name):
+def fetch_data_from_db(dataset_name, columns=None, resolution=None, aggregate=None):
 
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-
-        # Check if dataset exists
-        cursor.execute("SELECT COUNT(*) FROM timeseries_data WHERE dataset_name = ?", (dataset_name,))
-        if cursor.fetchone()[0] == 0:
-            logging.warning(f"Dataset '{dataset_name}' not found in database.")
-            return pd.DataFrame()
-
-        query = "SELECT timestamp, data FROM timeseries_data WHERE dataset_name = ?"
-        df = pd.read_sql_query(query, conn, params=(dataset_name,))
-        conn.close()
+        if resolution is None:
+            df = loader.load_dataset(dataset_name, columns=columns)
+        else:
+            # Hour/day/week rollups are maintained on write; one column at a time
+            df = loader.load_rollup(dataset_name, columns[0], resolution, aggregate)
 
         if df.empty:
             logging.warning(f"No data found for dataset '{dataset_name}'.")
             return df
 
-        # Convert JSON data to DataFrame
-        df["data"] = df["data"].apply(json.loads)
-        data_expanded = pd.json_normalize(df["data"])
-        df = df.drop(columns=["data"]).join(data_expanded)
-
         # Debugging: Print column names
         print("DEBUG: DataFrame Columns:", df.columns.tolist())
 
-        # Convert timestamp to datetime
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
-
         if df["timestamp"].isna().any():
             logging.error(f"Invalid timestamps detected in dataset '{dataset_name}'.")
             df = df.dropna(subset=["timestamp"])
@@ -77,23 +75,97 @@ def preprocess_data(df, dependent_col):
         logging.error(f"Column '{dependent_col}' could not be converted to numeric.")
         raise ValueError(f"Column '{dependent_col}' is not numeric.")
 
-    df = df.sort_values(by="timestamp")
-    df = df.dropna(subset=[dependent_col])  # Drop NaN values in dependent column
+    with metrics.span("preprocess"):
+        df = df.sort_values(by="timestamp")
+        df = df.dropna(subset=[dependent_col])  # Drop NaN values in dependent column
 
     return df
 
-def save_plot(fig):
+# ---------------------- PLOT CACHE ----------------------
+def plot_key(*parts):
+    """Content address for a cached plot or result: a hash of everything it depends on."""
+    raw = json.dumps(parts, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
 
-    import uuid
-    plot_filename = f"{PLOT_DIR}/{uuid.uuid4().hex}.png"
-    fig.savefig(plot_filename, bbox_inches="tight")
-    plt.close(fig)
-    return plot_filename
+def _touch(path):
+    """True if path exists; refreshes its mtime, which eviction uses as last-access time."""
+    try:
+        os.utime(path)
+        return True
+    except OSError:
+        return False
+
+def _write_atomic(path, write):
+    # Write-then-rename so concurrent requests never serve a partial file
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+def load_libraries(names=EDA_LIBRARIES):
+    for name in names:
+        importlib.import_module(name)
+
+def cached_plot(key):
+    """Path of the cached plot for key, or None if it has to be rendered."""
+    path = f"{PLOT_DIR}/{key}.png"
+    return path if _touch(path) else None
+
+def load_result(key):
+    path = f"{PLOT_DIR}/{key}.json"
+    if not _touch(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def save_result(key, result):
+    def write(path):
+        with open(path, "w") as f:
+            json.dump(result, f)
+    _write_atomic(f"{PLOT_DIR}/{key}.json", write)
+
+def evict_plots(max_bytes=None, max_age=None):
+    """Delete cached plots unused for max_age seconds, then least recently used ones over max_bytes."""
+    max_bytes = PLOT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_age = PLOT_MAX_AGE if max_age is None else max_age
+    cutoff = time.time() - max_age
+
+    if not os.path.isdir(PLOT_DIR):
+        return
+    files = []
+    for name in os.listdir(PLOT_DIR):
+        if not name.endswith((".png", ".json")):
+            continue
+        path = os.path.join(PLOT_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for mtime, size, path in sorted(files):
+        if mtime >= cutoff and total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
 
 def adf_test(series):
 
+    from statsmodels.tsa.stattools import adfuller
     try:
-        result = adfuller(series.dropna())
+        with metrics.span("adf_test"):
+            result = adfuller(series.dropna())
         p_value = result[1]
         stationarity = "Stationary" if p_value < 0.05 else "Non-Stationary"
         return p_value, stationarity
@@ -101,9 +173,241 @@ def adf_test(series):
         logging.error(f"ADF Test Error: {e}")
         return None, "Error in ADF Test"
 
-def generate_plots(dataset_name, dependent_col, moving_avg_window=7, heatmap_window=24):
+def detect_seasonality(values):
+    """
+    Seasonal periods detected in values, and the period used to decompose it: the
+    strongest one, else FALLBACK_PERIOD.
+    """
+    with metrics.span("seasonality"):
+        periods = seasonality.detect_periods(values)
+    period = periods[0]["period"] if periods else min(len(values) // 2, FALLBACK_PERIOD)
+    return {"periods": periods, "period": period, "detected": bool(periods)}
+
+def decompose(values, period):
+    """Trend, seasonal and residual components of values (see seasonality.decompose)."""
+    with metrics.span("decompose"):
+        return seasonality.decompose(values, period)
+
+# heatmap_window -> (row unit, column unit); units match storage.CALENDAR_LAYOUTS
+HEATMAP_UNITS = {
+    "weekly_vs_hours": ("weekday", "hour"),
+    "weeks_vs_months": ("week", "month"),
+    "hours_vs_months": ("hour", "month"),
+}
+DEFAULT_HEATMAP_UNITS = ("hour", "weekday")
+
+def _label_heatmap(table, row_unit, col_unit):
+    """Attach weekday/month names to a table keyed by integer calendar codes."""
+    if row_unit == "weekday":
+        table = table.reindex(range(7))  # Keep every weekday, in calendar order
+    names = {"weekday": lambda i: DAY_NAMES[i], "month": lambda i: MONTH_NAMES[i - 1]}
+    if row_unit in names:
+        table.index = [names[row_unit](int(i)) for i in table.index]
+    if col_unit in names:
+        table.columns = [names[col_unit](int(i)) for i in table.columns]
+    return table
+
+def heatmap_table(df, dependent_col, heatmap_window):
+    """Mean of dependent_col per calendar cell for the chosen heatmap layout, with named labels."""
+    row_unit, col_unit = HEATMAP_UNITS.get(heatmap_window, DEFAULT_HEATMAP_UNITS)
+    ts = df["timestamp"].dt
+    units = {"hour": ts.hour, "weekday": ts.dayofweek, "week": ts.isocalendar().week, "month": ts.month}
+
+    # Group on integer calendar codes; names are only attached to the small result
+    table = df[dependent_col].groupby([units[row_unit].to_numpy(), units[col_unit].to_numpy()]).mean().unstack()
+    return _label_heatmap(table, row_unit, col_unit)
+
+def calendar_heatmap(dataset_name, dependent_col, heatmap_window):
+    """
+    Heatmap table from the calendar aggregates kept by storage, in time independent of
+    the series length. None if the column has no aggregates (e.g. it is stored as text).
+    """
+    row_unit, col_unit = HEATMAP_UNITS.get(heatmap_window, DEFAULT_HEATMAP_UNITS)
+    layout = next((name for name, units in storage.CALENDAR_LAYOUTS.items()
+                   if set(units) == {row_unit, col_unit}), None)
+    table = storage.read_calendar(dataset_name, dependent_col, layout)
+    if table is None or table.empty:
+        return None
+    if storage.CALENDAR_LAYOUTS[layout] != (row_unit, col_unit):
+        table = table.T
+    return _label_heatmap(table, row_unit, col_unit)
+
+def _heatmap(dataset_name, df, dependent_col, heatmap_window):
+    table = calendar_heatmap(dataset_name, dependent_col, heatmap_window)
+    return table if table is not None else heatmap_table(df, dependent_col, heatmap_window)
+
+# ---------------------- RENDERING ----------------------
+# Figures are built with the object-oriented API (no pyplot state), so they can render
+# concurrently in threads or in a pool of worker processes.
+def _figure(figsize, rows=1):
+    from matplotlib.figure import Figure
+    fig = Figure(figsize=figsize)
+    return fig, fig.subplots(rows, 1)
+
+def _time_series_figure(x, y, dependent_col):
+    fig, ax = _figure((10, 5))
+    ax.plot(x, y, label="Time Series", color="blue")
+    ax.set_title(f"{dependent_col} Over Time")
+    ax.set_xlabel("Timestamp")
+    ax.set_ylabel(dependent_col)
+    ax.legend()
+    ax.grid()
+    return fig
+
+def _decomposition_figure(x, trend, seasonal, resid, period):
+    fig, axes = _figure((10, 10), rows=3)
+    axes[0].plot(x, trend, label="Trend", color="green")
+    axes[0].set_title("Trend Component")
+    axes[1].plot(x, seasonal, label="Seasonality", color="purple")
+    axes[1].set_title(f"Seasonality Component (period {period})")
+    axes[2].plot(x, resid, label="Cyclic Component", color="orange")
+    axes[2].set_title("Cyclic Component")
+    for ax in axes:
+        ax.legend()
+    return fig
+
+def _moving_avg_figure(x, y, moving_avg, moving_avg_window, dependent_col):
+    fig, ax = _figure((10, 5))
+    ax.plot(x, y, label=dependent_col, color="blue", linestyle="dashed")
+    ax.plot(x, moving_avg, label=f"Moving Avg ({moving_avg_window} Points)", linestyle="solid", color="red")
+    ax.set_title("Moving Average Trend")
+    ax.set_xlabel("Date")
+    ax.set_ylabel(dependent_col)
+    ax.legend()
+    ax.grid()
+    return fig
+
+def _heatmap_figure(pivot_table, dependent_col):
+    import seaborn as sns
+    fig, ax = _figure((12, 7))
+    sns.heatmap(pivot_table, cmap="coolwarm", linewidths=0.5, annot=True, fmt=".1f", ax=ax)
+    ax.set_title(f"Heatmap of {dependent_col}")
+    return fig
+
+FIGURES = {
+    "time_series": _time_series_figure,
+    "trend_seasonality": _decomposition_figure,
+    "moving_avg": _moving_avg_figure,
+    "heatmap": _heatmap_figure,
+}
+
+def render_plot(name, path, *args):
+    """Build figure `name` from args and write it to path as a PNG; returns path."""
+    with metrics.span("plot_render", plot=name):
+        fig = FIGURES[name](*args)
+        _write_atomic(path, lambda tmp: fig.savefig(tmp, bbox_inches="tight", format="png"))
+    return path
+
+def _render_in_worker(name, path, *args):
+    # Timing spans recorded in the worker process are sent back to the parent's metrics
+    with metrics.capture() as spans:
+        path = render_plot(name, path, *args)
+    return path, spans
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def _plot_pool():
+    """Long-lived render pool shared by all requests; worker processes import matplotlib once."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            if PLOT_EXECUTOR == "thread":
+                _pool = ThreadPoolExecutor(max_workers=PLOT_WORKERS)
+            else:
+                method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                _pool = ProcessPoolExecutor(max_workers=PLOT_WORKERS, mp_context=multiprocessing.get_context(method),
+                                            initializer=load_libraries, initargs=(RENDER_LIBRARIES,))
+        return _pool
+
+def start_plot_pool():
+    """Start the render workers ahead of the first request, so it does not pay for their imports."""
+    if PLOT_EXECUTOR == "process":
+        for _ in range(PLOT_WORKERS):
+            _plot_pool().submit(load_libraries, RENDER_LIBRARIES)
+
+def _reset_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def submit_plot(name, key, *args):
+    """
+    Start rendering plot `name` into the cache file for key; returns a Future of its path.
+
+    Rendering runs on the PLOT_EXECUTOR pool so several figures, and the caller's own
+    statistics, proceed at once; "serial" renders before returning.
+    """
+    path = f"{PLOT_DIR}/{key or uuid.uuid4().hex}.png"
+    if PLOT_EXECUTOR == "serial":
+        future = Future()
+        try:
+            future.set_result(render_plot(name, path, *args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+    if PLOT_EXECUTOR == "thread":
+        return _plot_pool().submit(render_plot, name, path, *args)
 
-    df = fetch_data_from_db(dataset_name)
+    future = Future()
+    def done(worker_future):
+        try:
+            path, spans = worker_future.result()
+            metrics.record(spans)
+            future.set_result(path)
+        except Exception as e:
+            future.set_exception(e)
+    try:
+        _plot_pool().submit(_render_in_worker, name, path, *args).add_done_callback(done)
+    except BrokenProcessPool:
+        _reset_pool()
+        return submit_plot(name, key, *args)
+    return future
+
+def _plot_keys(dataset_name, version, dependent_col, moving_avg_window, heatmap_window):
+    """Cache key of the whole EDA result, and of each plot over only the inputs it uses."""
+    result_key = plot_key(dataset_name, version, dependent_col, moving_avg_window, heatmap_window, "eda")
+    keys = {
+        "time_series": plot_key(dataset_name, version, dependent_col, "time_series"),
+        "trend_seasonality": plot_key(dataset_name, version, dependent_col, "trend_seasonality"),
+        "moving_avg": plot_key(dataset_name, version, dependent_col, moving_avg_window, "moving_avg"),
+        "heatmap": plot_key(dataset_name, version, dependent_col, heatmap_window, "heatmap"),
+        "adf_test": plot_key(dataset_name, version, dependent_col, "adf_test"),
+        "seasonality": plot_key(dataset_name, version, dependent_col, "seasonality"),
+    }
+    return result_key, keys
+
+# Entries of the plots result that are not images
+RESULT_ENTRIES = ("adf_test", "seasonality", "timings")
+
+def generate_plots(dataset_name, dependent_col, moving_avg_window=7, heatmap_window=24,
+                   resolution=None, aggregate=None):
+    """
+    Plots and ADF test for one column, served from the plot cache when possible.
+
+    Each plot is stored under a hash of (dataset, data version, column, plot type and
+    the parameters that plot uses), so a repeated request returns the existing files
+    without rendering, decomposing or re-running the ADF test; only the plots whose
+    inputs changed are redrawn. With a resolution the plots use that hour/day/week rollup.
+
+    Figures render concurrently on the plot pool while the seasonality detection,
+    decomposition and ADF test run here. "timings" reports the seconds from starting
+    each plot's data preparation to its file being written, and the total.
+    """
+    started = time.perf_counter()
+    source = loader.source_name(dataset_name, resolution, aggregate)
+    version = storage.get_version(dataset_name)
+    result_key, keys = _plot_keys(source, version, dependent_col, moving_avg_window, heatmap_window)
+
+    if version is not None:
+        plots = load_result(result_key)
+        if plots and all(cached_plot(keys[name]) for name in plots if name not in RESULT_ENTRIES):
+            logging.debug(f"EDA cache hit for '{dataset_name}' / '{dependent_col}'")
+            return dict(plots, timings={"total": round(time.perf_counter() - started, 4), "cached": True})
+
+    df = fetch_data_from_db(dataset_name, columns=[dependent_col], resolution=resolution, aggregate=aggregate)
     if df.empty:
         return {"error": "No data available in the database."}
 
@@ -112,83 +416,175 @@ def generate_plots(dataset_name, dependent_col, moving_avg_window=7, heatmap_win
     except ValueError as e:
         return {"error": str(e)}
 
-    plots = {}
+    # Cache entries describe the version that was actually read
+    if df.attrs.get("version") != version:
+        result_key, keys = _plot_keys(source, df.attrs.get("version"), dependent_col, moving_avg_window, heatmap_window)
+
+    plots, pending, timings = {}, {}, {}
+    x = df["timestamp"].to_numpy()
+    values = df[dependent_col].to_numpy(dtype=float)
+
+    def submit(name, *args, since):
+        # Per-plot latency runs from the start of its preparation until its file is written
+        future = submit_plot(name, keys[name], *args)
+        future.add_done_callback(lambda _: timings.setdefault(name, time.perf_counter() - since))
+        pending[name] = (future, since)
 
     # Time-Series Plot
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(df["timestamp"], df[dependent_col], label="Time Series", color="blue")
-    ax.set_title(f"{dependent_col} Over Time")
-    ax.set_xlabel("Timestamp")
-    ax.set_ylabel(dependent_col)
-    ax.legend()
-    ax.grid()
-    plots["time_series"] = save_plot(fig)
+    plots["time_series"] = cached_plot(keys["time_series"])
+    if plots["time_series"] is None:
+        submit("time_series", x, values, dependent_col, since=time.perf_counter())
+
+    # Moving Average Plot
+    plots["moving_avg"] = cached_plot(keys["moving_avg"])
+    if plots["moving_avg"] is None:
+        since = time.perf_counter()
+        moving_avg = df[dependent_col].rolling(window=moving_avg_window, min_periods=1).mean().to_numpy()
+        submit("moving_avg", x, values, moving_avg, moving_avg_window, dependent_col, since=since)
+
+    # Heatmap Plot
+    plots["heatmap"] = cached_plot(keys["heatmap"])
+    if plots["heatmap"] is None:
+        since = time.perf_counter()
+        try:
+            pivot_table = _heatmap(dataset_name, df, dependent_col, heatmap_window)
+
+            # Fill missing data
+            pivot_table = pivot_table.fillna(0)
+            submit("heatmap", pivot_table, dependent_col, since=since)
+        except Exception as e:
+            logging.warning(f"Heatmap generation failed: {e}")
+
+    # Seasonal periods, from the spectrum of the series (overlaps with the renders above)
+    since = time.perf_counter()
+    periods = load_result(keys["seasonality"])
+    if periods is None:
+        periods = detect_seasonality(values)
+        save_result(keys["seasonality"], periods)
+        timings["seasonality"] = time.perf_counter() - since
+    plots["seasonality"] = periods
 
     # Trend, Seasonality, and Cyclic Components
-    if len(df) >= 30:  # Ensure enough data points
+    plots["trend_seasonality"] = cached_plot(keys["trend_seasonality"])
+    if plots["trend_seasonality"] is None and len(df) >= 30:  # Ensure enough data points
         try:
-            decomposition = seasonal_decompose(df[dependent_col], period=min(len(df) // 2, 30), model="additive")
-
-            fig, axes = plt.subplots(3, 1, figsize=(10, 10))
-            axes[0].plot(decomposition.trend, label="Trend", color="green")
-            axes[0].set_title("Trend Component")
-            axes[1].plot(decomposition.seasonal, label="Seasonality", color="purple")
-            axes[1].set_title("Seasonality Component")
-            axes[2].plot(decomposition.resid, label="Cyclic Component", color="orange")
-            axes[2].set_title("Cyclic Component")
-            for ax in axes:
-                ax.legend()
-            plots["trend_seasonality"] = save_plot(fig)
+            decomposition = decompose(values, periods["period"])
+            submit("trend_seasonality", x[decomposition["index"]], decomposition["trend"],
+                   decomposition["seasonal"], decomposition["resid"], periods["period"], since=since)
         except Exception as e:
             logging.warning(f"Seasonal decomposition failed: {e}")
-
-    else:
+    elif plots["trend_seasonality"] is None:
         logging.warning(f"Not enough data points ({len(df)}) for seasonal decomposition.")
 
-    # Moving Average Plot
-    df["Moving_Avg"] = df[dependent_col].rolling(window=moving_avg_window, min_periods=1).mean()
-    fig, ax = plt.subplots(figsize=(10, 5))
-    ax.plot(df["timestamp"], df[dependent_col], label=dependent_col, color="blue", linestyle="dashed")
-    ax.plot(df["timestamp"], df["Moving_Avg"], label=f"Moving Avg ({moving_avg_window} Points)", linestyle="solid", color="red")
-    ax.set_title("Moving Average Trend")
-    ax.set_xlabel("Date")
-    ax.set_ylabel(dependent_col)
-    ax.legend()
-    ax.grid()
-    plots["moving_avg"] = save_plot(fig)
-    # Heatmap Plot
+    # ADF Test
+    since = time.perf_counter()
+    adf = load_result(keys["adf_test"])
+    if adf is None:
+        adf_p_value, stationarity = adf_test(df[dependent_col])
+        adf = {"p_value": adf_p_value, "stationarity": stationarity}
+        save_result(keys["adf_test"], adf)
+        timings["adf_test"] = time.perf_counter() - since
+    plots["adf_test"] = adf
+
+    for name, (future, since) in pending.items():
+        try:
+            plots[name] = future.result()
+            timings.setdefault(name, time.perf_counter() - since)  # In case the callback has not run yet
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                _reset_pool()
+            logging.warning(f"Rendering {name} failed: {e}")
+
+    for name, seconds in timings.items():
+        metrics.observe("eda_plot_seconds", seconds, "EDA latency per plot type, from data preparation to file", plot=name)
+    plots = {name: value for name, value in plots.items() if value is not None}
+    plots["timings"] = dict({name: round(seconds, 4) for name, seconds in timings.items()},
+                            total=round(time.perf_counter() - started, 4))
+
+    save_result(result_key, plots)
+    evict_plots()
+    return plots
+
+# ---------------------- DATA MODE ----------------------
+def _series_payload(x, y, points):
+    x, y = downsample(x, y, points)
+    return {"x": x.tolist(), "y": y.tolist()}
+
+def generate_eda_data(dataset_name, dependent_col, moving_avg_window=7, heatmap_window=24, points=None,
+                      resolution=None, aggregate=None):
+    """
+    EDA results as compact arrays for client-side charts instead of rendered PNGs.
+
+    The series, moving average and decomposition components (at the strongest detected
+    seasonal period) are downsampled with LTTB to about `points` points each (x in epoch
+    milliseconds); the heatmap is returned as its pivot table. Results are cached like
+    plots, keyed on the data version.
+    """
+    points = points or EDA_POINTS
+    source = loader.source_name(dataset_name, resolution, aggregate)
+    version = storage.get_version(dataset_name)
+    key = plot_key(source, version, dependent_col, moving_avg_window, heatmap_window, points, "eda_data")
+    if version is not None:
+        cached = load_result(key)
+        if cached:
+            logging.debug(f"EDA data cache hit for '{dataset_name}' / '{dependent_col}'")
+            return cached
+
+    df = fetch_data_from_db(dataset_name, columns=[dependent_col], resolution=resolution, aggregate=aggregate)
+    if df.empty:
+        return {"error": "No data available in the database."}
+
     try:
-        # Create necessary date parts
-        df["Day_of_Week"] = df["timestamp"].dt.day_name()
-        df["Hour"] = df["timestamp"].dt.hour
-        df["Week"] = df["timestamp"].dt.isocalendar().week
-        df["Month"] = df["timestamp"].dt.month_name()
-
-        # Dynamic pivot table based on user selection
-        if heatmap_window == "weekly_vs_hours":
-            pivot_table = df.pivot_table(values=dependent_col, index="Day_of_Week", columns="Hour", aggfunc="mean")
-            day_order = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
-            pivot_table = pivot_table.reindex(day_order)  # Reorder days
-        elif heatmap_window == "weeks_vs_months":
-            pivot_table = df.pivot_table(values=dependent_col, index="Week", columns="Month", aggfunc="mean")
-        elif heatmap_window == "hours_vs_months":
-            pivot_table = df.pivot_table(values=dependent_col, index="Hour", columns="Month", aggfunc="mean")
-        else:
-            pivot_table = df.pivot_table(values=dependent_col, index="Hour", columns="Day_of_Week", aggfunc="mean")
+        df = preprocess_data(df, dependent_col)
+    except ValueError as e:
+        return {"error": str(e)}
+
+    x = df["timestamp"].to_numpy(dtype="datetime64[ms]").astype(np.int64)
+    y = df[dependent_col].to_numpy(dtype=float)
+    result = {"mode": "data", "rows": len(y), "dependent_col": dependent_col, "resolution": resolution}
+
+    result["time_series"] = _series_payload(x, y, points)
 
-        # Fill missing data
-        pivot_table.fillna(0, inplace=True)
+    moving_avg = df[dependent_col].rolling(window=moving_avg_window, min_periods=1).mean().to_numpy()
+    result["moving_avg"] = dict(_series_payload(x, moving_avg, points), window=moving_avg_window)
 
-        # Plot heatmap
-        fig, ax = plt.subplots(figsize=(12, 7))
-        sns.heatmap(pivot_table, cmap="coolwarm", linewidths=0.5, annot=True, fmt=".1f", ax=ax)
-        ax.set_title(f"Heatmap of {dependent_col}")
-        plots["heatmap"] = save_plot(fig)
+    result["seasonality"] = detect_seasonality(y)
+    if len(y) >= 30:
+        try:
+            decomposition = decompose(y, result["seasonality"]["period"])
+            x_components = x[decomposition["index"]]
+            result["trend_seasonality"] = {
+                name: _series_payload(x_components, decomposition[name], points)
+                for name in ("trend", "seasonal", "resid")
+            }
+        except Exception as e:
+            logging.warning(f"Seasonal decomposition failed: {e}")
+    else:
+        logging.warning(f"Not enough data points ({len(y)}) for seasonal decomposition.")
+
+    try:
+        table = _heatmap(dataset_name, df, dependent_col, heatmap_window)
+        values = table.to_numpy(dtype=float)
+        result["heatmap"] = {
+            "index": [str(label) for label in table.index],
+            "columns": [str(label) for label in table.columns],
+            "values": [[None if np.isnan(v) else v for v in row] for row in values.tolist()],
+        }
     except Exception as e:
         logging.warning(f"Heatmap generation failed: {e}")
 
-    # ADF Test
-    adf_p_value, stationarity = adf_test(df[dependent_col])
-    plots["adf_test"] = {"p_value": adf_p_value, "stationarity": stationarity}
-
-    return plots
+    # Short series share the plot mode's ADF entry; long ones are tested on their recent tail
+    tail = y[-ADF_MAX_POINTS:]
+    adf_parts = (source, df.attrs.get("version"), dependent_col)
+    adf_key = plot_key(*adf_parts, "adf_test") if len(y) <= ADF_MAX_POINTS else plot_key(*adf_parts, ADF_MAX_POINTS, "adf_test")
+    adf = load_result(adf_key)
+    if adf is None:
+        adf_p_value, stationarity = adf_test(pd.Series(tail))
+        adf = {"p_value": adf_p_value, "stationarity": stationarity, "points": len(tail)}
+        save_result(adf_key, adf)
+    result["adf_test"] = adf
+
+    if version is not None and df.attrs.get("version") == version:
+        save_result(key, result)
+        evict_plots()
+    return result
@@ -1,42 +1,22 @@
 import pandas as pd
 import numpy as np
-import sqlite3
-import json
 import logging
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for Flask
+from models import fetch_data, FORECAST_MODELS
+from backtest import iter_backtest
+import loader
 
-from sklearn.metrics import mean_absolute_error, mean_squared_error
-from models import generate_forecasts  # Import forecast function
-
-# Configure logging
-logging.basicConfig(filename="evaluators.log", level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
-
-DATABASE_NAME = "data_storage.db"
-FORECAST_STEPS = 10  # Number of steps to predict
+FORECAST_STEPS = 10  # Number of steps to predict per backtest fold
 
 
 def fetch_actual_values(dataset_name, dependent_col):
 
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        query = """
-            SELECT DISTINCT timestamp, data FROM timeseries_data 
-            WHERE dataset_name = ? 
-            ORDER BY timestamp DESC
-            LIMIT ?
-        """
-        df = pd.read_sql_query(query, conn, params=(dataset_name, FORECAST_STEPS * 2))  # Fetch extra in case of duplicates
-        conn.close()
+        df = loader.load_series(dataset_name, dependent_col)
 
         if df.empty:
             logging.warning(f"WARNING: No data found for dataset '{dataset_name}'.")
             return []
 
-        df["data"] = df["data"].apply(json.loads)
-        data_expanded = pd.json_normalize(df["data"])
-        df = df.drop(columns=["data"]).join(data_expanded)
-
         # Debugging: Print actual column names
         print("DEBUG: DataFrame Columns in Evaluator:", df.columns.tolist())
 
@@ -44,11 +24,10 @@ def fetch_actual_values(dataset_name, dependent_col):
             logging.error(f"ERROR: Column '{dependent_col}' not found in dataset.")
             return []
 
-        df["timestamp"] = pd.to_datetime(df["timestamp"], errors="coerce")
         df = df.dropna(subset=["timestamp"]).sort_values("timestamp")  # Ensure chronological order
 
-        # Get the last unique values for comparison
-        unique_actual_values = df.drop_duplicates(subset=["timestamp"]).tail(FORECAST_STEPS)
+        # Timestamps are unique per dataset, so the last rows are the comparison window
+        unique_actual_values = df.tail(FORECAST_STEPS)
 
         # Convert to numeric and handle any errors
         unique_actual_values[dependent_col] = pd.to_numeric(unique_actual_values[dependent_col], errors="coerce")
@@ -65,6 +44,7 @@ def fetch_actual_values(dataset_name, dependent_col):
 
 
 def calculate_metrics(actual, forecast):
+    from sklearn.metrics import mean_absolute_error, mean_squared_error  # Imported on first use
 
     if len(actual) != len(forecast):
         logging.error("ERROR: Mismatch in actual and forecasted data length.")
@@ -103,43 +83,68 @@ def convert_numpy_to_python(obj):
         return obj
 
 
-def evaluate_models(dataset_name, dependent_col):
+def iter_fold_metrics(dataset_name, dependent_col, folds=None, window=None, window_size=None,
+                      resolution=None, aggregate=None):
+    """
+    Run a rolling-origin backtest and yield per-fold metrics as each fold completes.
+
+    Every fold forecasts FORECAST_STEPS points past its origin using only earlier
+    data; with a resolution the backtest runs on that hour/day/week rollup. Raises
+    ValueError if the dataset has no usable rows.
+    """
+    df = fetch_data(dataset_name, dependent_col, resolution, aggregate)
+    if df.empty:
+        raise ValueError("No valid data available.")
+
+    for result in iter_backtest(df, dependent_col, folds=folds, horizon=FORECAST_STEPS,
+                                window=window, window_size=window_size):
+        forecast = result["forecast"] or []
+        if result["error"] or len(forecast) < FORECAST_STEPS:
+            metrics = {"error": result["error"] or "Forecast generation failed"}
+        else:
+            metrics = calculate_metrics(result["actual"], forecast)
+
+        fold = {key: result[key] for key in ("model", "fold", "train_start", "origin")}
+        fold.update(metrics)
+        yield convert_numpy_to_python(fold)
+
+
+def summarize_folds(fold_results):
+    """Average fold metrics per model and rank the models by MAE, then RMSE."""
+    results = {}
+    for model in FORECAST_MODELS:
+        scored = [f for f in fold_results if f["model"] == model and "error" not in f]
+        if not scored:
+            logging.error(f"Model '{model}' failed to generate a valid forecast.")
+            results[model] = {"error": "Forecast generation failed"}
+            continue
+        results[model] = {metric: float(np.mean([f[metric] for f in scored])) for metric in ("MAE", "RMSE", "MAPE")}
+        results[model]["folds"] = len(scored)
+        logging.info(f"Evaluation for {model}: {results[model]}")
+
+    ranked_models = sorted(results.items(),
+                           key=lambda x: (x[1].get("MAE", float("inf")), x[1].get("RMSE", float("inf"))))
+    return {"ranked_models": ranked_models, "metrics": results}
+
+
+def evaluate_models(dataset_name, dependent_col, folds=None, window=None, window_size=None,
+                    resolution=None, aggregate=None):
     try:
         print(f"Evaluating models for dataset: {dataset_name}, column: {dependent_col}")
-        actual_values = fetch_actual_values(dataset_name, dependent_col)
+        fold_results = list(iter_fold_metrics(dataset_name, dependent_col, folds, window, window_size,
+                                              resolution, aggregate))
 
-        if len(actual_values) < FORECAST_STEPS:
-            error_msg = f"ERROR: Insufficient actual data for {FORECAST_STEPS}-step evaluation."
+        if not fold_results:
+            error_msg = f"ERROR: Insufficient data for {FORECAST_STEPS}-step backtest."
             logging.error(error_msg)
             return {"error": error_msg}
 
-        forecasts = generate_forecasts(dataset_name, dependent_col, steps=FORECAST_STEPS)
-
-        if not forecasts:
-            return {"error": "No forecasts generated."}
-
-        results = {}
-        for model, forecast in forecasts.items():
-            if isinstance(forecast, list):  # Ensure it's a list of dictionaries
-                forecast_values = [entry["forecast"] for entry in forecast if isinstance(entry, dict) and "forecast" in entry]
-            else:
-                forecast_values = []
-
-            if len(forecast_values) < FORECAST_STEPS:
-                logging.error(f"Model '{model}' failed to generate a valid forecast.")
-                results[model] = {"error": "Forecast generation failed"}
-                continue
-
-            print(f"DEBUG: Actual ({len(actual_values)}) vs Forecast ({len(forecast_values)}) for {model}")
-            metrics = calculate_metrics(actual_values, forecast_values)
-            results[model] = metrics
-            logging.info(f"Evaluation for {model}: {metrics}")
-
-        ranked_models = sorted(results.items(),
-                               key=lambda x: (x[1].get("MAE", float("inf")), x[1].get("RMSE", float("inf"))))
-
-        return convert_numpy_to_python({"ranked_models": ranked_models, "metrics": results})
+        summary = summarize_folds(fold_results)
+        summary["folds"] = sorted(fold_results, key=lambda f: (f["model"], f["fold"]))
+        return convert_numpy_to_python(summary)
 
+    except ValueError as e:
+        return {"error": str(e)}
     except Exception as e:
         logging.error(f"INTERNAL SERVER ERROR: {e}", exc_info=True)
         return {"error": "Internal server error."}
@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+# ---------------------- LAG FEATURES ----------------------
+def lag_matrix(values, lag):
+    """
+    One-step training set for lagged regression.
+
+    Returns (X, y) with X[i] = values[i:i+lag] and y[i] = values[i+lag]. X is a
+    read-only strided view of `values`, so no lag-sized copies are made.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) <= lag:
+        return np.empty((0, lag)), np.empty(0)
+    return sliding_window_view(values, lag)[:-1], values[lag:]
+
+
+def direct_matrix(values, lag, horizon):
+    """
+    Multi-output training set for direct forecasting.
+
+    Returns (X, Y) with X[i] = values[i:i+lag] and Y[i] = values[i+lag:i+lag+horizon],
+    both views over a single sliding window of length lag + horizon.
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) < lag + horizon:
+        return np.empty((0, lag)), np.empty((0, horizon))
+    windows = sliding_window_view(values, lag + horizon)
+    return windows[:, :lag], windows[:, lag:]
+
+
+# ---------------------- CALENDAR FEATURES ----------------------
+def calendar_features(timestamps):
+    """Hour, day of week and month for each timestamp, as a float matrix."""
+    ts = pd.DatetimeIndex(timestamps)
+    return np.column_stack([ts.hour, ts.dayofweek, ts.month]).astype(float)
+
+
+def future_timestamps(timestamps, steps):
+    """Continue a timestamp series for `steps` periods using its median spacing."""
+    ts = pd.DatetimeIndex(timestamps)
+    step = pd.Series(ts).diff().median() if len(ts) > 1 else pd.Timedelta(0)
+    if pd.isna(step) or step <= pd.Timedelta(0):
+        step = pd.Timedelta(days=1)
+    return pd.DatetimeIndex([ts[-1] + step * (i + 1) for i in range(steps)])
+
+
+def with_calendar(X, timestamps):
+    """Append calendar features of the target timestamps to a lag matrix."""
+    return np.hstack([X, calendar_features(timestamps)])
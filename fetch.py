@@ -1,41 +1,92 @@
-import requests
-import pandas as pd
-import sqlite3
 import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
-DATABASE_NAME = "data_storage.db"
-
-
-def fetch_data(api_url, dataset_name="default"):
-
+import requests
+import pandas as pd
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+import storage
+import loader
+
+# ---------------------- CONFIG ----------------------
+HTTP_TIMEOUT = 30  # Seconds per request
+HTTP_RETRIES = 3  # Retries for connection errors and 429/5xx responses
+HTTP_BACKOFF = 0.5  # Retry n waits HTTP_BACKOFF * 2 ** (n - 1) seconds
+REFRESH_WORKERS = 4  # Datasets synced at once
+
+_session = None
+_session_lock = threading.Lock()
+
+
+# ---------------------- HTTP ----------------------
+def get_session():
+    """Shared requests.Session with pooled keep-alive connections and retry/backoff."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            retry = Retry(
+                total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF,
+                status_forcelist=(429, 500, 502, 503, 504), allowed_methods=("GET",),
+            )
+            adapter = HTTPAdapter(max_retries=retry, pool_maxsize=max(10, REFRESH_WORKERS))
+            _session = requests.Session()
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+
+def download(api_url):
+    """Download and parse an API time series into a DataFrame sorted by its 'timestamp' column."""
+    response = get_session().get(api_url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    data = response.json()
+
+    # Dynamically identify time-series key (e.g., "Time Series (5min)")
+    time_series_key = next((key for key in data.keys() if "Time Series" in key), None)
+    if not time_series_key:
+        raise ValueError("No valid time-series data found in API response.")
+
+    # Convert nested time-series data into DataFrame
+    df = pd.DataFrame.from_dict(data[time_series_key], orient="index")
+    df.reset_index(inplace=True)
+
+    # Detect and format timestamp column
+    df, timestamp_col = detect_timestamp_column(df)
+    if not timestamp_col:
+        raise ValueError("No valid timestamp column detected in the data.")
+
+    # Ensure time-series is sorted chronologically
+    return df.sort_values(by="timestamp")
+
+
+# ---------------------- FETCH ----------------------
+def fetch_data(api_url, dataset_name="default", incremental=False):
+    """
+    Download a time series and store it under dataset_name.
+
+    With incremental=True only rows newer than the dataset's latest stored timestamp are
+    written; if there are none the dataset (and its version) is left untouched, so
+    cached data, plots and fitted models stay valid.
+    """
     try:
-        # Fetch data from API
-        response = requests.get(api_url)
-        response.raise_for_status()
-        data = response.json()
-
-        # Dynamically identify time-series key (e.g., "Time Series (5min)")
-        time_series_key = next((key for key in data.keys() if "Time Series" in key), None)
-        if not time_series_key:
-            raise ValueError("No valid time-series data found in API response.")
-
-        # Convert nested time-series data into DataFrame
-        df = pd.DataFrame.from_dict(data[time_series_key], orient="index")
-        df.reset_index(inplace=True)
+        df = download(api_url)
+        keys = df.columns.tolist()
 
-        # Detect and format timestamp column
-        df, timestamp_col = detect_timestamp_column(df)
-        if not timestamp_col:
-            raise ValueError("No valid timestamp column detected in the data.")
+        latest = storage.latest_timestamp(dataset_name) if incremental else None
+        if latest is not None:
+            df = df[df["timestamp"] > latest]
 
-        # Ensure time-series is sorted chronologically
-        df = df.sort_values(by="timestamp")
+        if df.empty:
+            print(f" Dataset '{dataset_name}' is up to date (latest {latest}).")
+            return {"status": "success", "keys": keys, "new_rows": 0, "latest": latest}
 
         # Store processed data in SQLite
-        keys = df.columns.tolist()
         store_data(dataset_name, df, keys)
 
-        return {"status": "success", "keys": keys}
+        return {"status": "success", "keys": keys, "new_rows": len(df), "latest": df["timestamp"].iloc[-1]}
 
     except Exception as e:
         print(" Fetch Data Error:", str(e))
@@ -52,7 +103,7 @@ def detect_timestamp_column(df):
         if pd.api.types.is_datetime64_any_dtype(df[col]):
             timestamp_col = col
             break
-        elif pd.api.types.is_object_dtype(df[col]):
+        elif pd.api.types.is_object_dtype(df[col]) or pd.api.types.is_string_dtype(df[col]):
             try:
                 df[col] = pd.to_datetime(df[col], errors='coerce')  # Try parsing as datetime
                 if df[col].notna().all():  # If successful for all rows
@@ -75,36 +126,10 @@ def detect_timestamp_column(df):
 
 def store_data(dataset_name, df, keys):
 
-    conn = sqlite3.connect(DATABASE_NAME)
-    cursor = conn.cursor()
-
-    # Create main timeseries table (if doesn't exist)
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS timeseries_data (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            dataset_name TEXT,
-            timestamp TEXT,
-            data TEXT,
-            keys TEXT
-        )
-    """)
-
-    # Insert each row of the dataset
-    for _, row in df.iterrows():
-        timestamp = row.get("timestamp")
-        if not timestamp:
-            continue
-
-        # Store row data as JSON, excluding timestamp
-        data = json.dumps(row.drop("timestamp").to_dict())
-        cursor.execute("""
-            INSERT INTO timeseries_data (dataset_name, timestamp, data, keys)
-            VALUES (?, ?, ?, ?)
-        """, (dataset_name, timestamp, data, json.dumps(keys)))  # Store keys as JSON for metadata
-
-    conn.commit()
-    conn.close()
-    print(f" Data stored successfully under dataset '{dataset_name}'.")
+    # Values go into a typed per-dataset table; keys are kept once in the catalog
+    count = storage.write_dataset(dataset_name, df, keys)
+    loader.invalidate(dataset_name)
+    print(f" Data stored successfully under dataset '{dataset_name}' ({count} rows).")
 
 
 
@@ -112,13 +137,7 @@ def store_data(dataset_name, df, keys):
 def list_datasets_from_db():
     """List all unique dataset names stored in the database."""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        cursor = conn.cursor()
-
-        # Fetch distinct dataset names
-        cursor.execute("SELECT DISTINCT dataset_name FROM timeseries_data")
-        datasets = [row[0] for row in cursor.fetchall()]
-        conn.close()
+        datasets = storage.list_datasets()
 
         print(" Available datasets:", datasets)
         return datasets
@@ -126,3 +145,44 @@ def list_datasets_from_db():
     except Exception as e:
         print(" ERROR fetching datasets:", str(e))
         return []
+
+
+# ---------------------- SCHEDULED REFRESH ----------------------
+def load_sources(path):
+    """Dataset name -> API URL mapping from a JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+def sync_datasets(sources, workers=None):
+    """Incrementally fetch every {dataset_name: api_url} in sources concurrently; returns per-dataset results."""
+    if not sources:
+        return {}
+    workers = max(1, min(workers or REFRESH_WORKERS, len(sources)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sync") as pool:
+        futures = {name: pool.submit(fetch_data, url, name, incremental=True) for name, url in sources.items()}
+        return {name: future.result() for name, future in futures.items()}
+
+
+def start_refresh(sources, interval, workers=None):
+    """
+    Sync sources every `interval` seconds on a background thread, starting immediately.
+
+    `sources` is a mapping or a path to a JSON file (re-read on every run, so datasets
+    can be added without a restart). Returns an Event; set it to stop the schedule.
+    """
+    stop = threading.Event()
+
+    def run():
+        while not stop.is_set():
+            try:
+                current = load_sources(sources) if isinstance(sources, str) else sources
+                results = sync_datasets(current, workers)
+                new_rows = {name: result.get("new_rows") for name, result in results.items()}
+                logging.info(f"Scheduled refresh: new rows per dataset {new_rows}")
+            except Exception as e:
+                logging.error(f"Scheduled refresh failed: {e}")
+            stop.wait(interval)
+
+    threading.Thread(target=run, name="refresh", daemon=True).start()
+    return stop
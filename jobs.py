@@ -0,0 +1,111 @@
+import json
+import logging
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+# ---------------------- CONFIG ----------------------
+JOB_WORKERS = 2  # Jobs executing at once
+MAX_QUEUE_DEPTH = 20  # Queued + running jobs before new submissions are rejected
+JOB_TTL = 3600  # Seconds a finished job's result is kept for polling
+
+_executor = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="job")
+_jobs = {}  # job_id -> job record
+_inflight = {}  # dedup key -> job_id of a queued/running job
+_lock = threading.Lock()
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue is at MAX_QUEUE_DEPTH."""
+
+
+def _purge():
+    """Forget finished jobs older than JOB_TTL. Caller holds the lock."""
+    cutoff = time.time() - JOB_TTL
+    for job_id in [job_id for job_id, job in _jobs.items() if job["finished_at"] and job["finished_at"] < cutoff]:
+        del _jobs[job_id]
+
+
+def _pending():
+    return sum(1 for job in _jobs.values() if job["status"] in ("queued", "running"))
+
+
+def submit(kind, func, *args, **kwargs):
+    """
+    Queue func(*args, **kwargs) as a background job and return its record.
+
+    Jobs are deduplicated on (kind, args, kwargs): submitting work identical to a
+    queued or running job returns that job instead of starting another one.
+    """
+    key = json.dumps([kind, args, kwargs], sort_keys=True, default=str)  # Hashable even for list/dict args
+    with _lock:
+        _purge()
+        if key in _inflight:
+            metrics.inc("jobs_deduplicated_total", help_text="Submissions answered by an identical in-flight job", kind=kind)
+            return view(_jobs[_inflight[key]])
+        if _pending() >= MAX_QUEUE_DEPTH:
+            metrics.inc("jobs_rejected_total", help_text="Submissions rejected because the queue was full", kind=kind)
+            raise QueueFullError(f"Job queue is full ({MAX_QUEUE_DEPTH} pending jobs).")
+        metrics.inc("jobs_submitted_total", help_text="Background jobs queued", kind=kind)
+
+        job = {
+            "id": uuid.uuid4().hex,
+            "kind": kind,
+            "status": "queued",
+            "result": None,
+            "error": None,
+            "submitted_at": time.time(),
+            "started_at": None,
+            "finished_at": None,
+        }
+        _jobs[job["id"]] = job
+        _inflight[key] = job["id"]
+
+    _executor.submit(_run, job, key, func, args, kwargs)
+    return view(job)
+
+
+def _run(job, key, func, args, kwargs):
+    job["status"] = "running"
+    job["started_at"] = time.time()
+    try:
+        job["result"] = func(*args, **kwargs)
+        job["status"] = "done"
+    except Exception as e:
+        logging.error(f"Job {job['id']} ({job['kind']}) failed: {e}", exc_info=True)
+        job["error"] = str(e)
+        job["status"] = "failed"
+    finally:
+        with _lock:
+            job["finished_at"] = time.time()
+            _inflight.pop(key, None)
+        metrics.observe("job_seconds", job["finished_at"] - job["started_at"], "Background job run time",
+                        kind=job["kind"], status=job["status"])
+
+
+def view(job):
+    """Public representation of a job; the result is only included once it is done."""
+    data = {key: job[key] for key in ("id", "kind", "status", "submitted_at", "started_at", "finished_at")}
+    if job["status"] == "done":
+        data["result"] = job["result"]
+    elif job["status"] == "failed":
+        data["error"] = job["error"]
+    return data
+
+
+def get_job(job_id):
+    with _lock:
+        job = _jobs.get(job_id)
+        return view(job) if job else None
+
+
+def job_stats():
+    """Number of known jobs per status."""
+    with _lock:
+        counts = {"queued": 0, "running": 0, "done": 0, "failed": 0}
+        for job in _jobs.values():
+            counts[job["status"]] += 1
+        return counts
@@ -0,0 +1,148 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import storage
+
+# ---------------------- CONFIG ----------------------
+CACHE_MAX_BYTES = 512 * 1024 * 1024  # Upper bound on memory held by cached DataFrames
+FLOAT_DTYPE = os.environ.get("LOADER_FLOAT_DTYPE", "float64")  # "float32" halves numeric columns at ~7 significant digits
+
+_cache = OrderedDict()  # (dataset_name, version) -> DataFrame, least recently used first
+_sizes = {}
+_lock = threading.Lock()
+_stats = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+
+
+# ---------------------- CACHE ----------------------
+def _frame_bytes(df):
+    return int(df.memory_usage(deep=True).sum())
+
+
+def _store(key, df):
+    """Insert/replace an entry and evict least recently used entries over the budget."""
+    size = _frame_bytes(df)
+    with _lock:
+        _cache.pop(key, None)
+        _sizes.pop(key, None)
+        if size > CACHE_MAX_BYTES:
+            logging.warning(f"Dataset '{key[0]}' ({size} bytes) exceeds the cache budget; not cached.")
+            return
+        _cache[key] = df
+        _sizes[key] = size
+        while sum(_sizes.values()) > CACHE_MAX_BYTES:
+            old_key, _ = _cache.popitem(last=False)
+            _sizes.pop(old_key, None)
+            _stats["evictions"] += 1
+
+
+def invalidate(dataset_name):
+    """Drop every cached version of a dataset (called after new rows are stored)."""
+    with _lock:
+        for key in [key for key in _cache if key[0] == dataset_name]:
+            del _cache[key]
+            _sizes.pop(key, None)
+            _stats["invalidations"] += 1
+
+
+def clear():
+    with _lock:
+        _cache.clear()
+        _sizes.clear()
+
+
+def cache_stats():
+    """Hit/miss/eviction counters plus current entry count and memory use."""
+    with _lock:
+        return dict(_stats, entries=len(_cache), bytes=sum(_sizes.values()), max_bytes=CACHE_MAX_BYTES)
+
+
+# ---------------------- LOAD ----------------------
+def load_dataset(dataset_name, columns=None):
+    """
+    Load a dataset with parsed timestamps through the shared LRU cache.
+
+    Entries are keyed by (dataset_name, version), so a write to the dataset makes old
+    entries unreachable even in other processes. Columns are read from SQLite on first
+    use, straight into NumPy arrays of FLOAT_DTYPE, and added to the cached frame.
+    The caller gets its own (copy-on-write) frame and may modify it; the data version
+    it reflects is in `df.attrs["version"]`.
+    """
+    info = storage.get_dataset_info(dataset_name)
+    if info is None:
+        return pd.DataFrame()
+
+    names = [col["name"] for col in info["columns"]]
+    wanted = names if columns is None else [name for name in columns if name in names]
+    key = (dataset_name, info["version"])
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        missing = [name for name in wanted if entry is None or name not in entry.columns]
+        _stats["hits" if not missing else "misses"] += 1
+
+    if missing:
+        timestamps, arrays = storage.read_arrays(dataset_name, columns=missing, dtype=FLOAT_DTYPE)
+        if timestamps is None or len(timestamps) == 0:
+            return pd.DataFrame()
+
+        if entry is not None and len(entry) == len(timestamps):
+            entry = entry.assign(**arrays)
+        else:
+            entry = pd.DataFrame({"timestamp": timestamps, **arrays}, copy=False)
+
+        # Only cache if nothing was written while we were reading
+        if storage.get_version(dataset_name) == info["version"]:
+            _store(key, entry)
+
+    result = entry[["timestamp"] + wanted]
+    result.attrs["version"] = info["version"]
+    return result
+
+
+def load_series(dataset_name, column):
+    """Timestamps and one value column of a dataset, served from the cache when possible."""
+    return load_dataset(dataset_name, columns=[column])
+
+
+def source_name(dataset_name, resolution=None, aggregate=None):
+    """Identity of a loaded series for downstream caches: the dataset, or the dataset at a rollup resolution."""
+    if resolution is None:
+        return dataset_name
+    return f"{dataset_name}@{resolution}:{aggregate or storage.ROLLUP_DEFAULT_AGGREGATE}"
+
+
+def load_rollup(dataset_name, column, resolution, aggregate=None):
+    """
+    Timestamps and one value column at hour/day/week resolution, read from the rollups
+    storage maintains on write (no resampling of raw rows). Cached like load_dataset,
+    under (dataset_name, version, resolution, column, aggregate).
+    """
+    aggregate = aggregate or storage.ROLLUP_DEFAULT_AGGREGATE
+    info = storage.get_dataset_info(dataset_name)
+    if info is None:
+        return pd.DataFrame()
+    key = (dataset_name, info["version"], resolution, column, aggregate)
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            _cache.move_to_end(key)
+        _stats["hits" if entry is not None else "misses"] += 1
+
+    if entry is None:
+        timestamps, values = storage.read_rollup(dataset_name, column, resolution, aggregate)
+        if timestamps is None or len(timestamps) == 0:
+            return pd.DataFrame()
+        entry = pd.DataFrame({"timestamp": timestamps, column: values.astype(FLOAT_DTYPE)}, copy=False)
+        if storage.get_version(dataset_name) == info["version"]:
+            _store(key, entry)
+
+    result = entry[["timestamp", column]]
+    result.attrs["version"] = info["version"]
+    return result
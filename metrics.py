@@ -0,0 +1,153 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# ---------------------- CONFIG ----------------------
+PREFIX = "tsa"  # Prometheus metric name prefix
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)  # Histogram bounds in seconds
+
+_lock = threading.Lock()
+_histograms = {}  # (name, labels) -> [count per bucket..., sum, count]
+_counters = {}  # (name, labels) -> value
+_help = {}  # name -> help text
+_collectors = []  # callables returning [(name, type, help, [(labels, value), ...])]
+_local = threading.local()
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+# ---------------------- RECORDING ----------------------
+def observe(name, seconds, help_text="", **labels):
+    """Add one duration to the histogram `name` with the given labels."""
+    key = _key(name, labels)
+    with _lock:
+        _help.setdefault(name, help_text)
+        hist = _histograms.setdefault(key, [0] * len(BUCKETS) + [0.0, 0])
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                hist[i] += 1
+        hist[-2] += seconds
+        hist[-1] += 1
+
+
+def inc(name, value=1, help_text="", **labels):
+    """Increase the counter `name` with the given labels."""
+    key = _key(name, labels)
+    with _lock:
+        _help.setdefault(name, help_text)
+        _counters[key] = _counters.get(key, 0) + value
+
+
+@contextmanager
+def span(stage, **labels):
+    """
+    Time a block as one stage (data load, parse, model fit, plot render, ...).
+
+    The duration goes into the `stage_seconds` histogram and, when a trace is active
+    on this thread, into that trace so the request can report its own breakdown.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record([(stage, labels, time.perf_counter() - start)])
+
+
+def record(spans):
+    """Add (stage, labels, seconds) spans, e.g. those captured in a worker process."""
+    trace = getattr(_local, "trace", None)
+    for stage, labels, seconds in spans:
+        observe("stage_seconds", seconds, "Time spent per processing stage", stage=stage, **labels)
+        if trace is not None:
+            trace.append((stage, labels, seconds))
+
+
+# ---------------------- TRACES ----------------------
+def start_trace():
+    """Start collecting this thread's spans (one trace per request)."""
+    _local.trace = []
+
+
+def end_trace():
+    """Stop collecting and return the spans recorded since start_trace()."""
+    trace = getattr(_local, "trace", None) or []
+    _local.trace = None
+    return trace
+
+
+@contextmanager
+def capture():
+    """Collect the spans of a block in a list, e.g. to send them back from a worker process."""
+    previous = getattr(_local, "trace", None)
+    spans = []
+    _local.trace = spans
+    try:
+        yield spans
+    finally:
+        _local.trace = previous
+        if previous is not None:
+            previous.extend(spans)
+
+
+def summarize(spans):
+    """Total seconds per stage (labels joined into the name), in first-seen order."""
+    totals = {}
+    for stage, labels, seconds in spans:
+        name = "_".join([stage] + [str(v) for _, v in sorted(labels.items())])
+        totals[name] = totals.get(name, 0.0) + seconds
+    return totals
+
+
+# ---------------------- EXPORT ----------------------
+def register_collector(func):
+    """Add a callable whose samples are read at scrape time: [(name, type, help, [(labels, value)])]."""
+    _collectors.append(func)
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, v in items)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(items, escaped)) + "}"
+
+
+def render():
+    """All metrics in the Prometheus text exposition format."""
+    lines = []
+
+    def header(name, kind, help_text):
+        lines.append(f"# HELP {PREFIX}_{name} {help_text or name}")
+        lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+    with _lock:
+        histograms = {key: list(value) for key, value in _histograms.items()}
+        counters = dict(_counters)
+        help_texts = dict(_help)
+
+    for name in sorted({name for name, _ in histograms}):
+        header(name, "histogram", help_texts.get(name))
+        for (metric, labels), hist in sorted(histograms.items()):
+            if metric != name:
+                continue
+            for bound, count in zip(BUCKETS, hist):
+                lines.append(f"{PREFIX}_{name}_bucket{_labels(labels, [('le', bound)])} {count}")
+            lines.append(f"{PREFIX}_{name}_bucket{_labels(labels, [('le', '+Inf')])} {hist[-1]}")
+            lines.append(f"{PREFIX}_{name}_sum{_labels(labels)} {hist[-2]:.6f}")
+            lines.append(f"{PREFIX}_{name}_count{_labels(labels)} {hist[-1]}")
+
+    for name in sorted({name for name, _ in counters}):
+        header(name, "counter", help_texts.get(name))
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{PREFIX}_{name}{_labels(labels)} {value}")
+
+    for collector in _collectors:
+        for name, kind, help_text, samples in collector():
+            header(name, kind, help_text)
+            for labels, value in samples:
+                lines.append(f"{PREFIX}_{name}{_labels(sorted(labels.items()))} {value}")
+
+    return "\n".join(lines) + "\n"
@@ -1,59 +1,167 @@
 import os
+import time
+import hashlib
+import functools
+import importlib
+import multiprocessing
+from multiprocessing import connection
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 import numpy as np
 import pandas as pd
-import sqlite3
-import json
 import logging
-from statsmodels.tsa.arima.model import ARIMA
-from statsmodels.tsa.statespace.sarimax import SARIMAX
-from xgboost import XGBRegressor
-from sklearn.ensemble import RandomForestRegressor
+import loader
+import metrics
+import storage
+import registry
+import features
+
+# statsmodels, xgboost and scikit-learn are imported on first use so that importing this
+# module (and the web app) stays fast; load_libraries() imports them ahead of time.
+MODEL_LIBRARIES = (
+    "statsmodels.tsa.arima.model",
+    "statsmodels.tsa.statespace.sarimax",
+    "xgboost",
+    "sklearn.ensemble",
+    "sklearn.metrics",
+)
 
 # ---------------------- CONFIG ----------------------
-logging.basicConfig(level=logging.INFO)
-DATABASE_NAME = "data_storage.db"
+FORECAST_EXECUTOR = os.environ.get("FORECAST_EXECUTOR", "process")  # "process", "thread" or "serial"
+MAX_WORKERS = os.cpu_count() or 1
+MODEL_TIMEOUT = float(os.environ.get("FORECAST_MODEL_TIMEOUT", 120))  # Seconds allowed per model fit
+THREAD_POLL_INTERVAL = 0.1  # Seconds between checks for queued thread fits that have started
+ARIMA_ORDER = (5, 1, 0)
+SARIMA_ORDER = (1, 1, 1)
+SARIMA_SEASONAL_ORDER = (1, 1, 1, 12)  # The period (12) is only used when none is detected
+SARIMA_SEASONAL_PERIOD = os.environ.get("SARIMA_SEASONAL_PERIOD", "auto")  # "auto" (detected) or a fixed period in rows
+SARIMA_MAX_PERIOD = 60  # Longest detected period SARIMA will use; longer seasons make its state space too large
+SEASONALITY_MAX_ROWS = 20000  # The SARIMA period is detected on at most this many recent rows
+TREE_STRATEGY = "recursive"  # Tree-model horizon strategy: "recursive" or "direct"
+TREE_CALENDAR_FEATURES = False  # Add hour/weekday/month features to the tree models
+TREE_INTERVALS = os.environ.get("TREE_INTERVALS", "true").lower() in ("1", "true", "yes")  # Tree-model prediction intervals
+INTERVAL_ALPHA = 0.05  # Tree-model intervals cover 1 - INTERVAL_ALPHA, like the statsmodels conf_int default
+CONFORMAL_FRACTION = 0.2  # Share of XGBoost training rows held out to calibrate its intervals
+CONFORMAL_MIN_ROWS = 20  # Fewer held-out forecasts than this and XGBoost returns no interval
+REFIT_FRACTION = 0.2  # Refit statsmodels models once appended rows exceed this share of the fitted rows
+ORDER_SEARCH = os.environ.get("ORDER_SEARCH") or None  # None (fixed orders above), "stepwise" or "grid"
+
+
+def load_libraries():
+    for name in MODEL_LIBRARIES:
+        importlib.import_module(name)
 
 
 # ---------------------- FETCH DATA ----------------------
-def fetch_data(dataset_name, dependent_col):
-    """Fetch dataset from SQLite and preprocess it."""
+def fetch_data(dataset_name, dependent_col, resolution=None, aggregate=None):
+    """Fetch dataset from SQLite and preprocess it; with a resolution, read the hour/day/week rollup instead."""
     try:
-        conn = sqlite3.connect(DATABASE_NAME)
-        query = "SELECT timestamp, data FROM timeseries_data WHERE dataset_name = ?"
-        df = pd.read_sql_query(query, conn, params=(dataset_name,))
-        conn.close()
+        if resolution is None:
+            df = loader.load_series(dataset_name, dependent_col)
+        else:
+            df = loader.load_rollup(dataset_name, dependent_col, resolution, aggregate)
 
         if df.empty:
             logging.warning(f"No data found for dataset '{dataset_name}'.")
             return pd.DataFrame()
 
-        df["data"] = df["data"].apply(json.loads)
-        data_expanded = pd.json_normalize(df["data"])
-        df = df.drop(columns=["data"]).join(data_expanded)
-
-        if dependent_col not in df.columns:
-            logging.error(f"Column '{dependent_col}' not found.")
-            return pd.DataFrame()
-
-        df[dependent_col] = pd.to_numeric(df[dependent_col], errors="coerce")
-        df.dropna(subset=[dependent_col], inplace=True)
-
-        return df[[dependent_col]].reset_index(drop=True)
+        return prepare_series(df, dependent_col)
 
     except Exception as e:
         logging.error(f"Database error: {e}")
         return pd.DataFrame()
 
 
+def prepare_series(df, dependent_col):
+    """Numeric, NaN-free (timestamp, dependent_col) frame from a loaded dataset; df is not modified."""
+    if dependent_col not in df.columns:
+        logging.error(f"Column '{dependent_col}' not found.")
+        return pd.DataFrame()
+
+    with metrics.span("preprocess"):
+        # Typed columns are already numeric; copies are only made for conversions and dropped NaNs
+        result = df[["timestamp", dependent_col]]
+        if not pd.api.types.is_numeric_dtype(result[dependent_col]):
+            result = result.assign(**{dependent_col: pd.to_numeric(result[dependent_col], errors="coerce")})
+        if result[dependent_col].hasnans:
+            result = result.dropna(subset=[dependent_col]).reset_index(drop=True)
+    result.attrs["version"] = df.attrs.get("version")
+    return result
+
+
+# ---------------------- MODEL REGISTRY ----------------------
+def _registry_key(data_key, dependent_col, spec):
+    """(registry key, data version) for a series, or (None, None) when caching is off."""
+    if not data_key or data_key[1] is None:
+        return None, None
+    dataset_name, version = data_key
+    return registry.model_key(dataset_name, dependent_col, spec), version
+
+
+def _series_hash(values):
+    return hashlib.sha1(np.ascontiguousarray(values, dtype=float).tobytes()).hexdigest()
+
+
+def _fit_state_space(build, endog, spec, data_key, **fit_kwargs):
+    """
+    Statsmodels results for endog, using estimated parameters from the model registry.
+
+    Only parameters are stored. For the same data, or data that only had rows
+    appended since estimation, the model is filtered once with the stored
+    parameters (equivalent to results.append(refit=False)) instead of being
+    re-estimated. Parameters are re-estimated once appended rows exceed REFIT_FRACTION.
+    """
+    key, version = _registry_key(data_key, endog.name, spec)
+    if key:
+        entry = registry.load(key)
+        if entry and "data_hash" in entry and entry["nobs"] <= len(endog) <= entry["fitted_nobs"] * (1 + REFIT_FRACTION):
+            if _series_hash(endog.values[:entry["nobs"]]) == entry["data_hash"]:
+                results = build(endog).filter(entry["model"])
+                if len(endog) > entry["nobs"]:
+                    registry.save(key, version, entry["model"], len(endog),
+                                  data_hash=_series_hash(endog.values), fitted_nobs=entry["fitted_nobs"])
+                return results
+
+    results = build(endog).fit(**fit_kwargs)
+    if key:
+        registry.save(key, version, np.asarray(results.params), len(endog),
+                      data_hash=_series_hash(endog.values), fitted_nobs=len(endog))
+    return results
+
+
+def _fit_regressor(build, X, y, dependent_col, spec, data_key):
+    """Fitted sklearn-style regressor, reused from the registry for an unchanged data version."""
+    key, version = _registry_key(data_key, dependent_col, spec)
+    if key:
+        entry = registry.load(key)
+        if entry and entry["version"] == version:
+            return entry["model"]
+
+    model = build()
+    model.fit(X, y)
+    if key:
+        registry.save(key, version, model, len(y))
+    return model
+
+
 # ---------------------- ARIMA ----------------------
-def arima_forecast(df, dependent_col, steps=10):
+def build_arima(endog, order=None):
+    from statsmodels.tsa.arima.model import ARIMA
+    return ARIMA(endog, order=tuple(order or ARIMA_ORDER))
+
+
+def arima_forecast(df, dependent_col, steps=10, data_key=None, order=None):
     try:
         print("\n🚀 Running ARIMA Forecast")
-        model = ARIMA(df[dependent_col], order=(5, 1, 0))
-        model_fit = model.fit()
+        order = tuple(order or ARIMA_ORDER)
+        with metrics.span("model_fit", model="ARIMA"):
+            model_fit = _fit_state_space(
+                functools.partial(build_arima, order=order), df[dependent_col],
+                {"model": "ARIMA", "order": order}, data_key,
+            )
 
-        forecast = model_fit.get_forecast(steps=steps)
-        conf_int = forecast.conf_int()
+        with metrics.span("model_predict", model="ARIMA"):
+            forecast = model_fit.get_forecast(steps=steps)
+            conf_int = forecast.conf_int()
 
         return [
             {
@@ -69,14 +177,41 @@ def arima_forecast(df, dependent_col, steps=10):
 
 
 # ---------------------- SARIMA ----------------------
-def sarima_forecast(df, dependent_col, steps=10):
+def detect_seasonal_order(values):
+    """
+    SARIMA seasonal order whose period is the strongest one detected in values (up to
+    SARIMA_MAX_PERIOD), or the period of SARIMA_SEASONAL_ORDER when none is found.
+    """
+    P, D, Q, period = SARIMA_SEASONAL_ORDER
+    if SARIMA_SEASONAL_PERIOD != "auto":
+        return (P, D, Q, int(SARIMA_SEASONAL_PERIOD))
+
+    import seasonality
+    values = np.asarray(values, dtype=float)[-SEASONALITY_MAX_ROWS:]
+    periods = seasonality.detect_periods(values, max_periods=1, max_period=SARIMA_MAX_PERIOD)
+    return (P, D, Q, periods[0]["period"] if periods else period)
+
+
+def build_sarima(endog, order=None, seasonal_order=None):
+    from statsmodels.tsa.statespace.sarimax import SARIMAX
+    return SARIMAX(endog, order=tuple(order or SARIMA_ORDER), seasonal_order=tuple(seasonal_order or SARIMA_SEASONAL_ORDER))
+
+
+def sarima_forecast(df, dependent_col, steps=10, data_key=None, order=None, seasonal_order=None):
     try:
         print("\n🚀 Running SARIMA Forecast")
-        model = SARIMAX(df[dependent_col], order=(1, 1, 1), seasonal_order=(1, 1, 1, 12))
-        model_fit = model.fit(disp=False)
-
-        forecast = model_fit.get_forecast(steps=steps)
-        conf_int = forecast.conf_int()
+        order = tuple(order or SARIMA_ORDER)
+        seasonal_order = tuple(seasonal_order or detect_seasonal_order(df[dependent_col]))
+        with metrics.span("model_fit", model="SARIMA"):
+            model_fit = _fit_state_space(
+                functools.partial(build_sarima, order=order, seasonal_order=seasonal_order), df[dependent_col],
+                {"model": "SARIMA", "order": order, "seasonal_order": seasonal_order},
+                data_key, disp=False,
+            )
+
+        with metrics.span("model_predict", model="SARIMA"):
+            forecast = model_fit.get_forecast(steps=steps)
+            conf_int = forecast.conf_int()
 
         return [
             {
@@ -91,32 +226,204 @@ def sarima_forecast(df, dependent_col, steps=10):
         return {"error": "SARIMA failed"}
 
 
-# ---------------------- XGBOOST ----------------------
-def xgboost_forecast(df, dependent_col, steps=10, lag=10):
-    try:
-        print("\n🚀 Running XGBoost Forecast")
-        data = df[dependent_col].values
-        X, y = [], []
+# ---------------------- TREE MODELS ----------------------
+def _recursive_paths(predict, windows, steps, calendar=None):
+    """
+    Recursive forecasts `steps` ahead from many starting windows at once.
+
+    windows is (m, lag) and calendar, if given, (m, steps, c) features of each target.
+    predict maps an (m, features) matrix to m one-step predictions, so every step is a
+    single batched call. Returns an (m, steps) array.
+    """
+    m, lag = windows.shape
+    path = np.empty((m, lag + steps))
+    path[:, :lag] = windows
+    rows = np.empty((m, lag + (calendar.shape[2] if calendar is not None else 0)))
+    for k in range(steps):
+        rows[:, :lag] = path[:, k:k + lag]
+        if calendar is not None:
+            rows[:, lag:] = calendar[:, k]
+        path[:, lag + k] = predict(rows)
+    return path[:, lag:]
+
+
+def _forest_arrays(trees):
+    """
+    Node arrays of all fitted trees concatenated, with child indices offset into the
+    combined arrays, plus each tree's root; lets _per_tree_predict walk every tree at once.
+    """
+    parts = [tree.tree_ for tree in trees]
+    offsets = np.cumsum([0] + [t.node_count for t in parts[:-1]])
+    left = np.concatenate([np.where(t.children_left >= 0, t.children_left + o, -1) for t, o in zip(parts, offsets)])
+    right = np.concatenate([np.where(t.children_right >= 0, t.children_right + o, -1) for t, o in zip(parts, offsets)])
+    return {
+        "left": left, "right": right, "roots": offsets,
+        "feature": np.concatenate([t.feature for t in parts]),
+        "threshold": np.concatenate([t.threshold for t in parts]),
+        "missing_left": np.concatenate([t.missing_go_to_left for t in parts]).astype(bool),
+        "value": np.concatenate([t.value[:, 0, 0] for t in parts]),
+        "depth": max(t.max_depth for t in parts),
+    }
 
-        for i in range(lag, len(data)):
-            X.append(data[i-lag:i])
-            y.append(data[i])
 
-        if len(X) == 0:
-            return {"error": "Not enough data for XGBoost."}
+def _per_tree_predict(forest, rows):
+    """
+    Prediction of tree i on rows[i] for every tree in one vectorized walk, one level per
+    iteration; matches DecisionTreeRegressor.predict, which compares float32 features.
+    """
+    rows = rows.astype(np.float32)
+    node = forest["roots"].copy()
+    at = np.arange(len(node))
+    for _ in range(forest["depth"]):
+        inner = forest["left"][node] >= 0
+        if not inner.any():
+            break
+        x = rows[at, np.maximum(forest["feature"][node], 0)]
+        go_left = (x <= forest["threshold"][node]) | (np.isnan(x) & forest["missing_left"][node])
+        node = np.where(inner, np.where(go_left, forest["left"][node], forest["right"][node]), node)
+    return forest["value"][node]
+
+
+def _tree_spread(model, row, steps, strategy, future_calendar):
+    """
+    (lower, upper) from the spread of the forest's individual trees.
+
+    Recursive forecasts run one path per tree, each fed its own predictions; every step
+    is a single vectorized walk of all trees (_per_tree_predict), so the spread grows with
+    the horizon like a statsmodels interval. Direct forecasts take every tree's
+    multi-output prediction.
+    """
+    trees = model.estimators_
+    if strategy == "direct":
+        paths = np.stack([np.ravel(tree.predict(row))[:steps] for tree in trees])
+    else:
+        forest = _forest_arrays(trees)
+        calendar = np.repeat(future_calendar[None], len(trees), axis=0) if future_calendar is not None else None
+        paths = _recursive_paths(functools.partial(_per_tree_predict, forest),
+                                 np.repeat(row, len(trees), axis=0), steps, calendar)
+    return np.quantile(paths, [INTERVAL_ALPHA / 2, 1 - INTERVAL_ALPHA / 2], axis=0)
+
+
+def _conformal_radius(build, X, y, lag, steps, strategy, spec, dependent_col, data_key):
+    """
+    Per-step interval half-widths from split-conformal calibration, or None if too few rows.
+
+    A second model is fitted on all but the last CONFORMAL_FRACTION of the training
+    rows and forecasts every held-out origin `steps` ahead in one batched pass; the
+    half-width for step k is the finite-sample (1 - INTERVAL_ALPHA) quantile of its
+    absolute errors. Half-widths are kept in the registry per data version.
+    """
+    key, version = _registry_key(data_key, dependent_col, dict(
+        spec, interval="conformal", alpha=INTERVAL_ALPHA, fraction=CONFORMAL_FRACTION, steps=steps))
+    if key:
+        entry = registry.load(key)
+        if entry and entry["version"] == version:
+            return entry["model"]
+
+    n_fit = int(len(X) * (1 - CONFORMAL_FRACTION))
+    model = build()
+    model.fit(X[:n_fit], y[:n_fit])
+    if strategy == "direct":
+        errors = np.abs(y[n_fit:] - np.reshape(model.predict(X[n_fit:]), y[n_fit:].shape))
+    else:
+        origins = np.arange(n_fit, len(X) - steps + 1)
+        targets = origins[:, None] + np.arange(steps)
+        calendar = X[targets, lag:] if X.shape[1] > lag else None  # Calendar columns of each target's row
+        errors = np.abs(_recursive_paths(model.predict, X[origins, :lag], steps, calendar) - y[targets])
+    if len(errors) < CONFORMAL_MIN_ROWS:
+        return None
+
+    level = min(1.0, np.ceil((len(errors) + 1) * (1 - INTERVAL_ALPHA)) / len(errors))
+    radius = np.quantile(errors, level, axis=0, method="higher")
+    if key:
+        registry.save(key, version, radius, len(y))
+    return radius
+
+
+def _tree_forecast(build, spec, df, dependent_col, steps, lag, strategy, calendar, data_key, interval=None):
+    """
+    Fit a lagged-feature regressor and forecast `steps` ahead, as (forecast, lower,
+    upper) arrays, or return None if the series is too short.
+
+    "recursive" trains a one-step model and feeds predictions back in, one predict
+    call per step. "direct" trains a multi-output model on the next `steps` values
+    and predicts the whole horizon in a single call. interval is None (bounds are None),
+    "trees" (spread of a forest's trees) or "conformal" (split-conformal calibration).
+    """
+    data = df[dependent_col].to_numpy(dtype=float)
+    timestamps = df["timestamp"] if calendar and "timestamp" in df.columns else None
+    spec = dict(spec, lag=lag, strategy=strategy, calendar=timestamps is not None)
+
+    if strategy == "direct":
+        X, y = features.direct_matrix(data, lag, steps)
+        spec["horizon"] = steps
+    else:
+        X, y = features.lag_matrix(data, lag)
+    if len(X) == 0:
+        return None
+
+    future_calendar = None
+    if timestamps is not None:
+        X = features.with_calendar(X, timestamps.iloc[lag:lag + len(X)])
+        future_calendar = features.calendar_features(features.future_timestamps(timestamps, steps))
+
+    with metrics.span("model_fit", model=spec["model"]):
+        model = _fit_regressor(build, X, y, dependent_col, spec, data_key)
+
+    row = data[-lag:].reshape(1, -1)
+    with metrics.span("model_predict", model=spec["model"]):
+        if strategy == "direct":
+            if future_calendar is not None:
+                row = np.hstack([row, future_calendar[:1]])
+            preds = np.ravel(model.predict(row))[:steps]
+        else:
+            calendar_rows = future_calendar[None] if future_calendar is not None else None
+            preds = _recursive_paths(model.predict, row, steps, calendar_rows)[0]
+
+    lower = upper = None
+    with metrics.span("model_interval", model=spec["model"]):
+        if interval == "trees":
+            lower, upper = _tree_spread(model, row, steps, strategy, future_calendar)
+        elif interval == "conformal":
+            radius = _conformal_radius(build, X, y, lag, steps, strategy, spec, dependent_col, data_key)
+            if radius is not None:
+                lower, upper = preds - radius, preds + radius
+    return preds, lower, upper
+
+
+def _tree_result(forecast):
+    """Forecast entries from (forecast, lower, upper) arrays; bounds are None without an interval."""
+    preds, lower, upper = forecast
+    return [
+        {
+            "forecast": float(p),
+            "lower_conf_int": float(lower[i]) if lower is not None else None,
+            "upper_conf_int": float(upper[i]) if upper is not None else None,
+        } for i, p in enumerate(preds)
+    ]
+
 
-        model = XGBRegressor(n_estimators=100)
-        model.fit(X, y)
+# ---------------------- XGBOOST ----------------------
+def _xgboost_regressor():
+    from xgboost import XGBRegressor
+    return XGBRegressor(n_estimators=100)
 
-        last_window = list(data[-lag:])
-        preds = []
 
-        for _ in range(steps):
-            pred = model.predict(np.array(last_window[-lag:]).reshape(1, -1))[0]
-            preds.append(pred)
-            last_window.append(pred)
+def xgboost_forecast(df, dependent_col, steps=10, lag=10, data_key=None, strategy=None, calendar=None,
+                     intervals=None):
+    try:
+        print("\n🚀 Running XGBoost Forecast")
+        forecast = _tree_forecast(
+            _xgboost_regressor, {"model": "XGBoost", "n_estimators": 100},
+            df, dependent_col, steps, lag, strategy or TREE_STRATEGY,
+            TREE_CALENDAR_FEATURES if calendar is None else calendar, data_key,
+            "conformal" if (TREE_INTERVALS if intervals is None else intervals) else None,
+        )
+
+        if forecast is None:
+            return {"error": "Not enough data for XGBoost."}
 
-        return [{"forecast": float(p), "lower_conf_int": None, "upper_conf_int": None} for p in preds]
+        return _tree_result(forecast)
 
     except Exception as e:
         logging.error(f"XGBoost error: {e}")
@@ -124,52 +431,333 @@ def xgboost_forecast(df, dependent_col, steps=10, lag=10):
 
 
 # ---------------------- RANDOM FOREST ----------------------
-def random_forest_forecast(df, dependent_col, steps=10, lag=10):
+def _random_forest_regressor():
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(n_estimators=100)
+
+
+def random_forest_forecast(df, dependent_col, steps=10, lag=10, data_key=None, strategy=None, calendar=None,
+                           intervals=None):
     try:
         print("\n🚀 Running Random Forest Forecast")
-        data = df[dependent_col].values
-        X, y = [], []
+        forecast = _tree_forecast(
+            _random_forest_regressor, {"model": "RandomForest", "n_estimators": 100},
+            df, dependent_col, steps, lag, strategy or TREE_STRATEGY,
+            TREE_CALENDAR_FEATURES if calendar is None else calendar, data_key,
+            "trees" if (TREE_INTERVALS if intervals is None else intervals) else None,
+        )
+
+        if forecast is None:
+            return {"error": "Not enough data for RandomForest."}
 
-        for i in range(lag, len(data)):
-            X.append(data[i-lag:i])
-            y.append(data[i])
+        return _tree_result(forecast)
 
-        if len(X) == 0:
-            return {"error": "Not enough data for RandomForest."}
+    except Exception as e:
+        logging.error(f"RandomForest error: {e}")
+        return {"error": "RandomForest failed"}
 
-        model = RandomForestRegressor(n_estimators=100)
-        model.fit(X, y)
 
-        last_window = list(data[-lag:])
-        preds = []
+# ---------------------- EXECUTORS ----------------------
+FORECAST_MODELS = {
+    "ARIMA": arima_forecast,
+    "SARIMA": sarima_forecast,
+    "XGBoost": xgboost_forecast,
+    "RandomForest": random_forest_forecast,
+}
+TREE_MODELS = ("XGBoost", "RandomForest")  # Accept strategy/calendar/intervals options
+STATE_SPACE_MODELS = {  # Model builder and fit() keyword arguments
+    "ARIMA": (build_arima, {}),
+    "SARIMA": (build_sarima, {"disp": False}),
+}
 
-        for _ in range(steps):
-            pred = model.predict(np.array(last_window[-lag:]).reshape(1, -1))[0]
-            preds.append(pred)
-            last_window.append(pred)
 
-        return [{"forecast": float(p), "lower_conf_int": None, "upper_conf_int": None} for p in preds]
+def _timed_fit(model_name, df, dependent_col, steps, data_key=None, options=None):
+    """Run one model and return (result, wall time in seconds)."""
+    start = time.perf_counter()
+    result = FORECAST_MODELS[model_name](df, dependent_col, steps, data_key=data_key, **(options or {}))
+    return result, time.perf_counter() - start
+
+
+def _timeout_error(model_name, timeout):
+    return {"error": f"{model_name} timed out after {timeout:g}s"}
+
+
+def _process_worker(writer, model_name, df, dependent_col, steps, data_key=None, options=None):
+    # Timing spans recorded in the child are sent back and added to the parent's metrics
+    with metrics.capture() as spans:
+        try:
+            result, elapsed = _timed_fit(model_name, df, dependent_col, steps, data_key, options)
+        except Exception as e:
+            logging.error(f"{model_name} worker error: {e}")
+            result, elapsed = {"error": f"{model_name} failed"}, 0.0
+    try:
+        writer.send((result, elapsed, spans))
+    finally:
+        writer.close()
+
+
+def process_context():
+    # Workers fork from a clean server process that already imported this module and the model libraries
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__, *MODEL_LIBRARIES])
+        return ctx
+    return multiprocessing.get_context("spawn")
 
-    except Exception as e:
-        logging.error(f"RandomForest error: {e}")
-        return {"error": "RandomForest failed"}
+
+def _run_processes(tasks, workers, timeout):
+    """One process per task, at most `workers` at a time; a task past its timeout is terminated."""
+    ctx = process_context()
+    queue = list(tasks.items())
+    running = {}  # pipe reader -> (key, model name, process, start time)
+    results, timings = {}, {}
+
+    try:
+        while queue or running:
+            while queue and len(running) < workers:
+                key, task = queue.pop(0)
+                reader, writer = ctx.Pipe(duplex=False)
+                process = ctx.Process(target=_process_worker, args=(writer,) + task, daemon=True)
+                process.start()
+                writer.close()
+                running[reader] = (key, task[0], process, time.monotonic())
+
+            next_deadline = min(start for _, _, _, start in running.values()) + timeout
+            for reader in connection.wait(list(running), timeout=max(0.0, next_deadline - time.monotonic())):
+                key, model_name, process, start = running.pop(reader)
+                try:
+                    results[key], timings[key], spans = reader.recv()
+                    metrics.record(spans)
+                except EOFError:
+                    logging.error(f"{model_name} worker exited without a result.")
+                    results[key], timings[key] = {"error": f"{model_name} failed"}, time.monotonic() - start
+                reader.close()
+                process.join()
+
+            now = time.monotonic()
+            for reader, (key, model_name, process, start) in list(running.items()):
+                if now - start >= timeout:
+                    logging.warning(f"{model_name} exceeded {timeout:g}s; cancelling.")
+                    process.terminate()
+                    process.join()
+                    reader.close()
+                    del running[reader]
+                    results[key], timings[key] = _timeout_error(model_name, timeout), now - start
+    finally:
+        for reader, (_, _, process, _) in running.items():
+            process.terminate()
+            reader.close()
+
+    return results, timings
+
+
+def _run_threads(tasks, workers, timeout):
+    """
+    Thread pool variant; each fit's timeout counts from when a worker picks it up, and
+    timed-out fits are abandoned (threads cannot be killed).
+    """
+    pool = ThreadPoolExecutor(max_workers=workers)
+    started = {}  # key -> time the fit started running
+
+    def run(key, task):
+        started[key] = time.monotonic()
+        return _timed_fit(*task)
+
+    futures = {pool.submit(run, key, task): key for key, task in tasks.items()}
+    results, timings = {}, {}
+    pending = set(futures)
+    while pending:
+        # Fits still queued have no deadline yet; poll until one of them starts
+        deadlines = [started[futures[future]] + timeout for future in pending if futures[future] in started]
+        wait_for = max(0.0, min(deadlines) - time.monotonic()) if deadlines else THREAD_POLL_INTERVAL
+        done, pending = wait(pending, timeout=wait_for, return_when=FIRST_COMPLETED)
+        for future in done:
+            key = futures[future]
+            model_name = tasks[key][0]
+            try:
+                results[key], timings[key] = future.result()
+            except Exception as e:
+                logging.error(f"{model_name} worker error: {e}")
+                results[key], timings[key] = {"error": f"{model_name} failed"}, time.monotonic() - started[key]
+        now = time.monotonic()
+        for future in [f for f in pending if futures[f] in started and now - started[futures[f]] >= timeout]:
+            key = futures[future]
+            pending.discard(future)
+            results[key], timings[key] = _timeout_error(tasks[key][0], timeout), now - started[key]
+
+    pool.shutdown(wait=False, cancel_futures=True)
+    return results, timings
+
+
+def run_models(tasks, executor=None, timeout=None, workers=None):
+    """
+    Fit and forecast a set of model tasks concurrently.
+
+    `tasks` maps a result key to (model_name, df, dependent_col, steps[, data_key[, options]]),
+    where data_key = (dataset_name, version) enables the fitted-model registry and
+    options are extra keyword arguments for the model function. Returns
+    (results, timings) keyed the same way, where a failed or timed-out model yields
+    {"error": ...} without affecting the others.
+    """
+    executor = executor or FORECAST_EXECUTOR
+    timeout = MODEL_TIMEOUT if timeout is None else timeout
+    workers = max(1, min(workers or MAX_WORKERS, len(tasks)))
+
+    if executor == "process":
+        return _run_processes(tasks, workers, timeout)
+    if executor == "thread":
+        return _run_threads(tasks, workers, timeout)
+
+    results, timings = {}, {}
+    for key, task in tasks.items():
+        results[key], timings[key] = _timed_fit(*task)
+    return results, timings
+
+
+# ---------------------- ORDER SEARCH ----------------------
+def search_orders(series, data_key, method, model_names=None, seasonal_order=None):
+    """{model: order search result} for the ARIMA/SARIMA models, cached per data version."""
+    import order_search  # Imports this module, so it is loaded on first use
+
+    return {
+        name: order_search.select_order(name, series, data_key, method=method, seasonal_order=seasonal_order)
+        for name in (model_names or STATE_SPACE_MODELS) if name in STATE_SPACE_MODELS
+    }
+
+
+def _state_space_options(name, orders, seasonal_order):
+    """Keyword arguments for an ARIMA/SARIMA model: the detected season (SARIMA) and any searched orders."""
+    options = {"seasonal_order": seasonal_order} if name == "SARIMA" and seasonal_order else {}
+    result = orders.get(name)
+    if result and result.get("order"):
+        options.update({key: result[key] for key in ("order", "seasonal_order") if result.get(key)})
+    return options or None
 
 
 # ---------------------- GENERATE FORECASTS ----------------------
-def generate_forecasts(dataset_name, dependent_col, steps=10):
-    """Fetch data and generate forecasts using all models."""
-    df = fetch_data(dataset_name, dependent_col)
+def generate_forecasts(dataset_name, dependent_col, steps=10, executor=None, timeout=None,
+                       strategy=None, calendar=None, order_search=None, resolution=None, aggregate=None,
+                       intervals=None):
+    """
+    Fetch data and generate forecasts using all models, fitted concurrently.
+
+    SARIMA's seasonal period is detected from the series and reported under
+    "seasonal_order". With order_search ("stepwise" or "grid", default ORDER_SEARCH) the
+    ARIMA/SARIMA orders are searched first and reported under "orders". With resolution
+    ("hour", "day" or "week") the models are fitted on that rollup's `aggregate` (default mean).
+    intervals (default TREE_INTERVALS) turns the XGBoost/RandomForest prediction intervals on or off.
+    """
+    df = fetch_data(dataset_name, dependent_col, resolution, aggregate)
 
     if df.empty:
         return {"error": "No valid data available."}
 
     print(f"\n✅ Dataset '{dataset_name}' - Column '{dependent_col}': {df.shape[0]} rows")
 
-    forecasts = {
-        "ARIMA": arima_forecast(df, dependent_col, steps),
-        "SARIMA": sarima_forecast(df, dependent_col, steps),
-        "XGBoost": xgboost_forecast(df, dependent_col, steps),
-        "RandomForest": random_forest_forecast(df, dependent_col, steps)
+    # Rollups are separate series for the registry, so fitted models never mix resolutions
+    data_key = (loader.source_name(dataset_name, resolution, aggregate), df.attrs.get("version"))
+    with metrics.span("seasonality"):
+        seasonal_order = detect_seasonal_order(df[dependent_col])
+    method = order_search or ORDER_SEARCH
+    orders = search_orders(df[dependent_col], data_key, method, seasonal_order=seasonal_order) if method else {}
+
+    tree_options = {"strategy": strategy, "calendar": calendar, "intervals": intervals}
+    tasks = {
+        name: (name, df, dependent_col, steps, data_key,
+               tree_options if name in TREE_MODELS else _state_space_options(name, orders, seasonal_order))
+        for name in FORECAST_MODELS
     }
+    forecasts, timings = run_models(tasks, executor=executor, timeout=timeout)
+
+    forecasts = {name: forecasts[name] for name in FORECAST_MODELS}
+    forecasts["timings"] = {name: round(timings[name], 3) for name in FORECAST_MODELS}
+    forecasts["seasonal_order"] = list(seasonal_order)
+    if orders:
+        forecasts["orders"] = orders
     print(forecasts)
     return forecasts
+
+
+# ---------------------- BATCH FORECASTS ----------------------
+BATCH_COLUMNS = ("dataset_name", "dependent_col", "model", "step", "forecast", "lower_conf_int", "upper_conf_int")
+
+
+def generate_batch_forecasts(specs, executor=None, timeout=None, store=False):
+    """
+    Forecast many series in one run.
+
+    `specs` is a list of {"dataset_name", "dependent_col", "steps" (default 10),
+    "models" (a list of names, or one name; default all), "order_search" (default ORDER_SEARCH)}. Each dataset is loaded once for all of its specs and
+    every (spec, model) fit is scheduled on one shared worker pool. Returns a columnar
+    payload with one entry per forecast step, plus "errors" and per-fit "timings".
+    With store=True the rows are also written to the forecast_results table.
+    """
+    columns = {name: [] for name in BATCH_COLUMNS}
+    errors, timings, tasks = [], [], {}
+
+    by_dataset = {}
+    for i, spec in enumerate(specs):
+        by_dataset.setdefault(spec.get("dataset_name"), []).append((i, spec))
+
+    for dataset_name, items in by_dataset.items():
+        wanted = sorted({spec.get("dependent_col") for _, spec in items if spec.get("dependent_col")})
+        frame = loader.load_dataset(dataset_name, columns=wanted) if dataset_name else pd.DataFrame()
+
+        for i, spec in items:
+            dependent_col = spec.get("dependent_col")
+            entry = {"dataset_name": dataset_name, "dependent_col": dependent_col}
+            try:
+                steps = int(spec.get("steps", 10))
+            except (TypeError, ValueError):
+                errors.append(dict(entry, model=None, error="Steps must be an integer."))
+                continue
+
+            names = spec.get("models") or list(FORECAST_MODELS)
+            if isinstance(names, str):
+                names = [names]
+            if not isinstance(names, list) or not all(isinstance(name, str) for name in names):
+                errors.append(dict(entry, model=None, error="models must be a list of model names."))
+                continue
+            unknown = [name for name in names if name not in FORECAST_MODELS]
+            if unknown:
+                errors.append(dict(entry, model=None, error=(
+                    f"Unknown model(s) {', '.join(map(repr, unknown))}; choose from {', '.join(FORECAST_MODELS)}."
+                )))
+                continue
+
+            series = prepare_series(frame, dependent_col) if not frame.empty and dependent_col else pd.DataFrame()
+            if series.empty:
+                errors.append(dict(entry, model=None, error="No valid data available."))
+                continue
+
+            data_key = (dataset_name, series.attrs.get("version"))
+            method = spec.get("order_search") or ORDER_SEARCH
+            if method not in (None, "stepwise", "grid"):
+                errors.append(dict(entry, model=None, error="order_search must be 'stepwise' or 'grid'."))
+                continue
+            seasonal_order = detect_seasonal_order(series[dependent_col]) if "SARIMA" in names else None
+            orders = search_orders(series[dependent_col], data_key, method, names, seasonal_order) if method else {}
+            for name in names:
+                options = _state_space_options(name, orders, seasonal_order) if name in STATE_SPACE_MODELS else None
+                tasks[(i, name)] = (name, series, dependent_col, steps, data_key, options)
+
+    results, fit_timings = run_models(tasks, executor=executor, timeout=timeout) if tasks else ({}, {})
+
+    for i, name in sorted(results):
+        spec, result = specs[i], results[(i, name)]
+        entry = {"dataset_name": spec.get("dataset_name"), "dependent_col": spec.get("dependent_col"), "model": name}
+        timings.append(dict(entry, seconds=round(fit_timings[(i, name)], 3)))
+        if isinstance(result, dict):
+            errors.append(dict(entry, error=result.get("error", f"{name} failed")))
+            continue
+        for step, point in enumerate(result, start=1):
+            for key in ("dataset_name", "dependent_col", "model"):
+                columns[key].append(entry[key])
+            columns["step"].append(step)
+            for key in ("forecast", "lower_conf_int", "upper_conf_int"):
+                columns[key].append(point[key])
+
+    payload = dict(columns, errors=errors, timings=timings)
+    if store and columns["step"]:
+        payload["run_id"] = storage.write_forecast_results(columns)
+    return payload
@@ -0,0 +1,322 @@
+import copy
+import logging
+import math
+import threading
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, BrokenExecutor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+import numpy as np
+
+import metrics
+import models
+import registry
+
+# ---------------------- CONFIG ----------------------
+SEARCH_METHOD = "stepwise"  # "stepwise" or "grid"
+SEARCH_TIME_LIMIT = 60  # Seconds of candidate fitting per search; the best order so far is kept
+MAX_P, MAX_D, MAX_Q = 5, 2, 5
+MAX_SEASONAL_P, MAX_SEASONAL_Q = 1, 1
+SEARCH_MAX_ROWS = 2000  # Candidates are scored on the most recent rows only
+SCREEN_ROWS = 300  # Short window used to prune candidates before the full scoring fit
+SCREEN_KEEP = 0.25  # Share of screened candidates (at least SCREEN_MIN_KEEP) that go on to full scoring
+SCREEN_MIN_KEEP = 3
+FIT_MAXITER = 50  # Optimizer iterations per candidate fit
+ADF_PVALUE = 0.05  # Differencing stops once the ADF test rejects a unit root at this level
+SCORE_FIT_KWARGS = {
+    "ARIMA": {"method_kwargs": {"maxiter": FIT_MAXITER}},
+    "SARIMA": {"disp": False, "maxiter": FIT_MAXITER},
+}
+
+
+# ---------------------- SCORING ----------------------
+class _DeadlinePassed(Exception):
+    pass
+
+
+def _stop_at(deadline):
+    """Optimizer callback that aborts a fit once the wall-clock deadline has passed."""
+    def callback(*args):
+        if time.time() >= deadline:
+            raise _DeadlinePassed()
+    return callback
+
+
+def _score(model_name, values, order, seasonal_order, deadline=None):
+    """
+    AIC of one candidate order on values, or inf when the fit fails or runs past
+    `deadline` (wall-clock seconds; checked before the fit and at every optimizer iteration).
+    """
+    if deadline is not None and time.time() >= deadline:
+        return math.inf
+    build, _ = models.STATE_SPACE_MODELS[model_name]
+    kwargs = {"seasonal_order": seasonal_order} if seasonal_order else {}
+    fit_kwargs = copy.deepcopy(SCORE_FIT_KWARGS[model_name])  # statsmodels updates method_kwargs in place
+    if deadline is not None:
+        # ARIMA passes optimizer options through method_kwargs; SARIMAX takes them directly
+        fit_kwargs.get("method_kwargs", fit_kwargs)["callback"] = _stop_at(deadline)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            aic = float(build(values, order=order, **kwargs).fit(**fit_kwargs).aic)
+    except _DeadlinePassed:
+        logging.debug(f"{model_name} {order} {seasonal_order} fit stopped at the search deadline")
+        return math.inf
+    except Exception as e:
+        logging.debug(f"{model_name} {order} {seasonal_order} fit failed: {e}")
+        return math.inf
+    return aic if math.isfinite(aic) else math.inf
+
+
+def _score_all(pool, model_name, values, candidates, deadline):
+    """
+    {candidate: AIC} for the candidates scored before the deadline.
+
+    Candidates still queued at the deadline are cancelled, and fits already running in
+    the workers stop at their next optimizer iteration.
+    """
+    wall_deadline = time.time() + (deadline - time.monotonic())  # Workers compare against their own clock
+    futures = {
+        pool.submit(_score, model_name, values, order, seasonal_order, wall_deadline): (order, seasonal_order)
+        for order, seasonal_order in candidates
+    }
+    scores, pending = {}, set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                scores[futures[future]] = future.result()
+            except Exception as e:
+                logging.error(f"{model_name} order search worker error: {e}")
+                scores[futures[future]] = math.inf
+        if not done:
+            break
+
+    for future in pending:
+        future.cancel()
+    return scores
+
+
+def _screened(pool, model_name, values, candidates, deadline):
+    """
+    Full-window AIC of the candidates that survive pruning.
+
+    With many candidates and a long series, every candidate is first fitted on the
+    last SCREEN_ROWS points; only the best SCREEN_KEEP share gets the full scoring
+    fit. Failed fits are dropped at either stage.
+    """
+    candidates = list(dict.fromkeys(candidates))
+    keep = max(SCREEN_MIN_KEEP, math.ceil(len(candidates) * SCREEN_KEEP))
+    if len(values) > 2 * SCREEN_ROWS and len(candidates) > keep:
+        screen = _score_all(pool, model_name, values[-SCREEN_ROWS:], candidates, deadline)
+        candidates = sorted((c for c, aic in screen.items() if math.isfinite(aic)), key=screen.get)[:keep]
+
+    scores = _score_all(pool, model_name, values, candidates, deadline)
+    return {candidate: aic for candidate, aic in scores.items() if math.isfinite(aic)}
+
+
+# ---------------------- CANDIDATES ----------------------
+def differencing_order(values, seasonal_period=None, seasonal_diff=0):
+    """Smallest d <= MAX_D for which the ADF test rejects a unit root (after any seasonal differencing)."""
+    from statsmodels.tsa.stattools import adfuller
+
+    series = np.asarray(values, dtype=float)
+    for _ in range(seasonal_diff):
+        series = series[seasonal_period:] - series[:-seasonal_period]
+
+    for d in range(MAX_D + 1):
+        if len(series) < 20 or np.ptp(series) == 0:
+            return d
+        try:
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore")
+                pvalue = adfuller(series, autolag="AIC")[1]
+            if pvalue < ADF_PVALUE:
+                return d
+        except Exception as e:
+            logging.warning(f"ADF test failed at d={d}: {e}")
+            return d
+        series = np.diff(series)
+    return MAX_D
+
+
+def _candidate(p, d, q, seasonal):
+    """(order, seasonal_order) with seasonal = (P, D, Q, m) or None."""
+    return (p, d, q), seasonal
+
+
+def grid_candidates(d, seasonal=None):
+    """Every (p, q) up to MAX_P/MAX_Q, crossed with every (P, Q) up to the seasonal limits."""
+    seasonal_parts = [None]
+    if seasonal:
+        _, D, _, m = seasonal
+        seasonal_parts = [(P, D, Q, m) for P in range(MAX_SEASONAL_P + 1) for Q in range(MAX_SEASONAL_Q + 1)]
+    return [
+        _candidate(p, d, q, s)
+        for p in range(MAX_P + 1) for q in range(MAX_Q + 1) for s in seasonal_parts
+    ]
+
+
+def _initial_candidates(d, seasonal=None):
+    """Stepwise starting points: (2,d,2), (0,d,0), (1,d,0), (0,d,1), seasonal parts alike."""
+    starts = [(2, 2, 1, 1), (0, 0, 0, 0), (1, 0, 1, 0), (0, 1, 0, 1)]
+    candidates = []
+    for p, q, P, Q in starts:
+        s = None
+        if seasonal:
+            s = (min(P, MAX_SEASONAL_P), seasonal[1], min(Q, MAX_SEASONAL_Q), seasonal[3])
+        candidates.append(_candidate(min(p, MAX_P), d, min(q, MAX_Q), s))
+    return candidates
+
+
+def _neighbours(candidate):
+    """Orders one step away from candidate: p, q, P, Q by +-1 each, and p and q together."""
+    (p, d, q), seasonal = candidate
+    moves = [(dp, dq, 0, 0) for dp, dq in ((1, 0), (-1, 0), (0, 1), (0, -1), (1, 1), (-1, -1))]
+    if seasonal:
+        moves += [(0, 0, dP, dQ) for dP, dQ in ((1, 0), (-1, 0), (0, 1), (0, -1))]
+
+    result = []
+    for dp, dq, dP, dQ in moves:
+        np_, nq = p + dp, q + dq
+        if not (0 <= np_ <= MAX_P and 0 <= nq <= MAX_Q):
+            continue
+        s = None
+        if seasonal:
+            P, D, Q, m = seasonal
+            if not (0 <= P + dP <= MAX_SEASONAL_P and 0 <= Q + dQ <= MAX_SEASONAL_Q):
+                continue
+            s = (P + dP, D, Q + dQ, m)
+        result.append(_candidate(np_, d, nq, s))
+    return result
+
+
+# ---------------------- SEARCH ----------------------
+_pools = {}  # (executor, workers) -> pool shared by all searches of this process
+_pools_lock = threading.Lock()
+
+
+def _pool(executor, workers):
+    """Long-lived worker pool, so each search does not pay worker start-up again."""
+    with _pools_lock:
+        if (executor, workers) not in _pools:
+            if executor == "thread":
+                _pools[executor, workers] = ThreadPoolExecutor(max_workers=workers)
+            else:
+                _pools[executor, workers] = ProcessPoolExecutor(max_workers=workers, mp_context=models.process_context())
+        return _pools[executor, workers]
+
+
+def _discard_pool(executor, workers):
+    with _pools_lock:
+        pool = _pools.pop((executor, workers), None)
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _SerialPool:
+    """Runs submissions inline, for executor="serial"; nothing runs once the deadline has passed."""
+
+    def __init__(self, deadline):
+        self.deadline = deadline
+
+    def submit(self, func, *args):
+        future = Future()
+        if time.monotonic() >= self.deadline:
+            return future
+        try:
+            future.set_result(func(*args))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+
+def search_order(model_name, values, method=None, time_limit=None, executor=None, workers=None,
+                 seasonal_order=None):
+    """
+    Pick the (order, seasonal_order) with the lowest AIC for an ARIMA or SARIMA model.
+
+    d is chosen first with ADF tests (the seasonal D and period come from seasonal_order,
+    default models.SARIMA_SEASONAL_ORDER), then p, q (and P, Q) are searched. "grid" scores
+    every combination; "stepwise" starts from a few common orders and moves to the
+    best neighbour until none improves. Candidate fits run on a long-lived worker pool,
+    are pruned on a short window first, and stop at `time_limit` seconds.
+    """
+    method = method or SEARCH_METHOD
+    time_limit = SEARCH_TIME_LIMIT if time_limit is None else time_limit
+    executor = executor or models.FORECAST_EXECUTOR
+    started = time.monotonic()
+    deadline = started + time_limit
+
+    values = np.asarray(values, dtype=float)[-SEARCH_MAX_ROWS:]
+    seasonal = tuple(seasonal_order or models.SARIMA_SEASONAL_ORDER) if model_name == "SARIMA" else None
+    d = differencing_order(values, seasonal and seasonal[3], seasonal[1] if seasonal else 0)
+
+    workers = max(1, workers or models.MAX_WORKERS)
+    pool = _SerialPool(deadline) if executor == "serial" else _pool(executor, workers)
+    scores = {}
+    try:
+        if method == "grid":
+            scores.update(_screened(pool, model_name, values, grid_candidates(d, seasonal), deadline))
+        else:
+            candidates = _initial_candidates(d, seasonal)
+            tried = set()
+            while candidates and time.monotonic() < deadline:
+                best_before = min(scores.values(), default=math.inf)
+                scores.update(_screened(pool, model_name, values, candidates, deadline))
+                tried.update(candidates)
+                if not scores or min(scores.values()) >= best_before:
+                    break
+                best = min(scores, key=scores.get)
+                candidates = [c for c in _neighbours(best) if c not in tried]
+    except BrokenExecutor as e:
+        # A worker died (e.g. out of memory); the next search starts a fresh pool
+        logging.error(f"{model_name} order search pool failed: {e}")
+        _discard_pool(executor, workers)
+
+    elapsed = time.monotonic() - started
+    result = {"method": method, "candidates": len(scores), "seconds": round(elapsed, 3),
+              "timed_out": time.monotonic() >= deadline}
+    if not scores:
+        logging.warning(f"{model_name} order search found no usable order; keeping the default.")
+        return dict(result, order=None, seasonal_order=None, aic=None)
+
+    (order, seasonal_order), aic = min(scores.items(), key=lambda item: item[1])
+    return dict(result, order=list(order), seasonal_order=list(seasonal_order) if seasonal_order else None,
+                aic=round(aic, 3))
+
+
+def select_order(model_name, series, data_key=None, method=None, time_limit=None, executor=None,
+                 seasonal_order=None):
+    """
+    Orders for model_name on a series, from the registry when this data version was already searched.
+
+    Returns the search_order() result with "cached" set. The result is keyed by dataset,
+    column, model and search settings, so later forecasts of an unchanged dataset skip
+    the search entirely. Searches that hit the time limit are not kept.
+    """
+    method = method or SEARCH_METHOD
+    seasonal_order = list(seasonal_order or models.SARIMA_SEASONAL_ORDER) if model_name == "SARIMA" else None
+    spec = {
+        "search": model_name, "method": method, "max_order": [MAX_P, MAX_D, MAX_Q],
+        "max_seasonal": [MAX_SEASONAL_P, MAX_SEASONAL_Q],
+        "seasonal_order": seasonal_order,
+        "max_rows": SEARCH_MAX_ROWS,
+    }
+    key, version = None, None
+    if data_key and data_key[1] is not None:
+        key, version = registry.model_key(data_key[0], series.name, spec), data_key[1]
+        entry = registry.load(key)
+        if entry and entry["version"] == version:
+            metrics.inc("order_search_total", help_text="ARIMA/SARIMA order searches", model=model_name, result="cached")
+            return dict(entry["model"], cached=True)
+
+    with metrics.span("order_search", model=model_name):
+        result = search_order(model_name, series.to_numpy(dtype=float), method, time_limit, executor,
+                              seasonal_order=seasonal_order)
+    metrics.inc("order_search_total", help_text="ARIMA/SARIMA order searches", model=model_name, result="searched")
+
+    # A search cut short by the time limit may have missed the best order; the next call searches again
+    if key and result["order"] and not result["timed_out"]:
+        registry.save(key, version, result, len(series))
+    return dict(result, cached=False)
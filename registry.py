@@ -0,0 +1,90 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import tempfile
+import time
+
+# ---------------------- CONFIG ----------------------
+REGISTRY_DIR = "model_registry"
+MAX_REGISTRY_BYTES = 1024 * 1024 * 1024  # Total size of stored models before eviction
+
+
+def model_key(dataset_name, column, spec):
+    """Stable file key for a fitted model of one series under one model specification."""
+    raw = json.dumps([dataset_name, column, spec], sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def _path(key):
+    return os.path.join(REGISTRY_DIR, f"{key}.pkl")
+
+
+def load(key):
+    """
+    Stored entry {"version", "nobs", "model", "saved_at", ...} for key, or None.
+
+    Loading refreshes the file's mtime, which eviction uses as last-access time.
+    """
+    path = _path(key)
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path, "rb") as f:
+            entry = pickle.load(f)
+        os.utime(path)
+        return entry
+    except Exception as e:
+        logging.warning(f"Discarding unreadable model registry entry {key}: {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return None
+
+
+def save(key, version, model, nobs, **extra):
+    """
+    Persist a fitted model (or its parameters) for the given data version, then
+    enforce the size bound. Extra keyword arguments are stored alongside it.
+    """
+    os.makedirs(REGISTRY_DIR, exist_ok=True)
+    entry = dict(extra, version=version, nobs=nobs, model=model, saved_at=time.time())
+    try:
+        # Write-then-rename so concurrent readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=REGISTRY_DIR, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _path(key))
+    except Exception as e:
+        logging.warning(f"Could not store model {key}: {e}")
+        return
+    evict()
+
+
+def evict(max_bytes=None):
+    """Delete least recently used models until the registry fits in max_bytes."""
+    max_bytes = MAX_REGISTRY_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(REGISTRY_DIR):
+        return
+    files = []
+    for name in os.listdir(REGISTRY_DIR):
+        if not name.endswith(".pkl"):
+            continue
+        path = os.path.join(REGISTRY_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        files.append((stat.st_mtime, stat.st_size, path))
+
+    total = sum(size for _, size, _ in files)
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
@@ -0,0 +1,196 @@
+import math
+
+import numpy as np
+
+# ---------------------- CONFIG ----------------------
+MAX_POINTS = 1 << 20  # Longer series are analysed on their most recent points
+MAX_PERIODS = 3  # Periods reported per series
+MIN_PEAK_RATIO = 20  # Peaks of the differenced series' periodogram below this multiple of the local median are noise
+NOISE_FLOOR_BINS = 32  # Frequency bins per block over which that local median is taken
+MIN_STRENGTH = 0.01  # A period must carry at least this share of the detrended series' spectral power
+MIN_ACF = 0.1  # A peak is seasonal only if the autocorrelation at its period reaches this
+RELATED_TOLERANCE = 0.1  # Relative distance at which a period counts as a repeat or harmonic of a stronger one
+DECOMPOSE_MAX_POINTS = 200_000  # Longer series are decomposed on a block-averaged (or recent) copy
+
+
+# ---------------------- SPECTRUM ----------------------
+def _detrended(values, max_points):
+    """Finite values of the most recent max_points, minus their least-squares line."""
+    y = np.asarray(values, dtype=float)
+    y = y[np.isfinite(y)][-max_points:]
+    if len(y) < 2:
+        return y
+    t = np.arange(len(y), dtype=float)
+    slope, intercept = np.polyfit(t, y, 1)
+    return y - (slope * t + intercept)
+
+
+def _noise_floor(power, bins=NOISE_FLOOR_BINS):
+    """Median of power over consecutive blocks of `bins` frequency bins, repeated per bin."""
+    blocks = -(-len(power) // bins)
+    padded = np.concatenate((power, np.full(blocks * bins - len(power), np.nan)))
+    return np.repeat(np.nanmedian(padded.reshape(blocks, bins), axis=1), bins)[:len(power)]
+
+
+def autocorrelation(y):
+    """
+    Autocorrelation of y at every lag 0..n-1, in O(n log n) through the FFT. Each lag is
+    normalised by its number of overlapping pairs so long lags are not biased towards zero.
+    """
+    n = len(y)
+    y = y - y.mean()
+    size = 1 << (2 * n - 1).bit_length()  # Zero padding avoids circular wrap-around
+    spectrum = np.fft.rfft(y, size)
+    acf = np.fft.irfft(spectrum * np.conj(spectrum), size)[:n] / np.arange(n, 0, -1)
+    return acf / acf[0] if acf[0] > 0 else np.zeros(n)
+
+
+def detect_periods(values, max_periods=MAX_PERIODS, min_period=2, max_period=None, max_points=MAX_POINTS):
+    """
+    Dominant seasonal periods of a series, in samples, strongest first.
+
+    Candidates are peaks of the periodogram of the differenced series that stand out from
+    its local median: differencing whitens random walks and trends, whose spectra would
+    otherwise rise towards low frequencies and turn noise into peaks. Each is refined to
+    the interpolated peak frequency when its bin spans only a few lags, else to the
+    autocorrelation maximum within the bin (checked against its neighbouring lags by
+    _sharpest), and kept if it carries MIN_STRENGTH of the
+    detrended series' spectral power, the autocorrelation there reaches MIN_ACF and it is
+    neither a repeat nor a harmonic (an integer fraction) of a period already kept. Later
+    candidates must reach MIN_ACF after the seasonal profile of the kept periods is
+    removed. Periods are limited to [min_period, max_period], and to half the series so at
+    least two cycles are observed.
+    Returns a list of {"period", "strength" (share of spectral power), "acf"}.
+    """
+    y = _detrended(values, max_points)
+    n = len(y)
+    max_period = min(max_period or n // 2, n // 2)
+    if n < 8 or max_period < min_period or not np.any(y):
+        return []
+
+    power = np.abs(np.fft.rfft(y)) ** 2
+    total = power[1:].sum()
+    diff = np.diff(y, prepend=y[0])  # Same length, so both spectra share their frequency bins
+    white = np.abs(np.fft.rfft(diff - diff.mean())) ** 2
+    k = np.arange(len(power))
+    in_range = (k >= max(1, math.ceil(n / max_period))) & (k <= n / min_period)
+    is_peak = np.zeros(len(power), dtype=bool)
+    is_peak[1:-1] = (white[1:-1] > white[:-2]) & (white[1:-1] >= white[2:])
+    is_peak &= in_range & (white > MIN_PEAK_RATIO * _noise_floor(white)) & (power >= MIN_STRENGTH * total)
+    candidates = k[is_peak]
+    candidates = candidates[np.argsort(power[candidates])[::-1][:10 * max_periods]]
+
+    residual = y
+    acf = first_acf = autocorrelation(residual)
+    periods = []
+    for bin_ in candidates:
+        lo = max(min_period, int(n // (bin_ + 1)))
+        hi = min(max_period, int(math.ceil(n / (bin_ - 1))) if bin_ > 1 else max_period)
+        if hi < lo:
+            continue
+        if hi - lo <= 4:  # The bin is narrow enough for the interpolated frequency to fix the period
+            lag = min(max(int(round(n / _peak_frequency(power, bin_))), lo), hi)
+        else:
+            lag = _sharpest(y, lo + int(np.argmax(first_acf[lo:hi + 1])), lo, hi)
+        if acf[lag] < MIN_ACF or any(_is_related(lag, p["period"]) for p in periods):
+            continue
+        periods.append({"period": lag, "strength": float(power[bin_] / total), "acf": float(acf[lag])})
+        if len(periods) == max_periods:
+            break
+        # Later periods are checked on what the kept ones leave unexplained
+        residual = residual - _phase_means(residual, lag)[np.arange(n) % lag]
+        acf = autocorrelation(residual)
+    return periods
+
+
+def _phase_means(y, period):
+    """Mean of the non-NaN values of y at each phase 0..period-1, centered on zero."""
+    phase = np.arange(len(y)) % period
+    known = ~np.isnan(y)
+    counts = np.bincount(phase[known], minlength=period)
+    means = np.bincount(phase[known], weights=y[known], minlength=period) / np.maximum(counts, 1)
+    return means - means.mean()
+
+
+def _sharpest(y, lag, lo, hi, radius=2):
+    """
+    Period within `radius` of lag (and within [lo, hi]) whose phase profile has the most
+    variance: a profile at the true period keeps its full amplitude over the series,
+    while one a lag off drifts out of phase and averages away. Fixes the off-by-one lags
+    the autocorrelation maximum gives on noisy series.
+    """
+    lags = range(max(lo, lag - radius), min(hi, lag + radius) + 1)
+    return max(lags, key=lambda p: np.var(_phase_means(y, p)))
+
+
+def _peak_frequency(power, bin_):
+    """Fractional frequency bin of a periodogram peak, from a parabola through its log power."""
+    a, b, c = np.log(power[bin_ - 1:bin_ + 2] + 1e-300)
+    curvature = a - 2 * b + c
+    return bin_ + (0.5 * (a - c) / curvature if curvature < 0 else 0.0)
+
+
+def _is_related(period, stronger):
+    """True if period is close to stronger / m for an integer m >= 1."""
+    m = round(stronger / period)
+    return m >= 1 and abs(stronger / m - period) <= RELATED_TOLERANCE * period
+
+
+# ---------------------- DECOMPOSITION ----------------------
+def moving_average(y, window):
+    """
+    Centered moving average in O(n) from cumulative sums; even windows use the 2 x window
+    average of classical decomposition. The first and last window // 2 values are NaN.
+    """
+    n = len(y)
+    result = np.full(n, np.nan)
+    if window > n:
+        return result
+    sums = np.concatenate(([0.0], np.cumsum(y)))
+    ma = (sums[window:] - sums[:-window]) / window
+    if window % 2 == 0:
+        ma = (ma[:-1] + ma[1:]) / 2
+    half = window // 2
+    result[half:half + len(ma)] = ma
+    return result
+
+
+def _reduction(n, period, max_points):
+    """
+    (block size, start) for decomposing a long series: block-average by a divisor of the
+    period when that keeps at least two points per cycle, else use the most recent points.
+    """
+    if not max_points or n <= max_points:
+        return 1, 0
+    needed = math.ceil(n / max_points)
+    step = next((d for d in range(needed, period // 2 + 1) if period % d == 0), None)
+    if step is None:
+        return 1, n - max_points
+    return step, n % step
+
+
+def decompose(values, period, max_points=DECOMPOSE_MAX_POINTS):
+    """
+    Additive classical decomposition (trend, seasonal, resid) in time linear in the length.
+
+    The trend is a centered moving average over one period, the seasonal component the
+    mean detrended value per phase (centered on zero), and the residual what remains.
+    Series longer than max_points are decomposed on a block-averaged or recent copy;
+    "index" gives the position in `values` of each returned point and "step" the block size.
+    """
+    y = np.asarray(values, dtype=float)
+    step, start = _reduction(len(y), period, max_points)
+    index = np.arange(start, len(y), step)
+    y = y[start:]
+    if step > 1:
+        y = y.reshape(-1, step).mean(axis=1)
+        period //= step
+    if period < 2 or len(y) < 2 * period:
+        raise ValueError(f"Need at least two full periods of {period} points to decompose.")
+
+    trend = moving_average(y, period)
+    seasonal = _phase_means(y - trend, period)[np.arange(len(y)) % period]
+    return {
+        "trend": trend, "seasonal": seasonal, "resid": y - trend - seasonal,
+        "period": period, "step": step, "index": index,
+    }
@@ -11,6 +11,134 @@ document.addEventListener('DOMContentLoaded', () => {
     const datasetNameSpan = document.getElementById('dataset-name');
     if (datasetNameSpan) datasetNameSpan.innerText = datasetName;
 
+    function renderAdf(adf) {
+        // Handle ADF test result (if present)
+        if (!adf) return;
+        const adfSection = document.createElement("div");
+        adfSection.innerHTML = `
+            <h3>Stationarity Test (ADF)</h3>
+            <p><strong>p-value:</strong> ${adf.p_value}</p>
+            <p><strong>Conclusion:</strong> ${adf.stationarity}</p>
+        `;
+        edaResult.appendChild(adfSection);
+    }
+
+    function renderSeasonality(seasonality) {
+        // Detected seasonal periods (in rows of the chosen resolution)
+        if (!seasonality) return;
+        const section = document.createElement("div");
+        const periods = seasonality.periods.length
+            ? seasonality.periods.map(p => `${p.period} (${(p.strength * 100).toFixed(1)}% of spectral power)`).join(", ")
+            : `none detected; decomposed with period ${seasonality.period}`;
+        section.innerHTML = `
+            <h3>Seasonality</h3>
+            <p><strong>Periods (rows):</strong> ${periods}</p>
+        `;
+        edaResult.appendChild(section);
+    }
+
+    function addCanvasSection(title, height = 300) {
+        const section = document.createElement("div");
+        section.innerHTML = `<h3>${title}</h3>`;
+        const canvas = document.createElement("canvas");
+        canvas.width = 1000;
+        canvas.height = height;
+        canvas.style.maxWidth = "100%";
+        canvas.style.background = "#fff";
+        canvas.style.borderRadius = "8px";
+        canvas.style.marginBottom = "20px";
+        section.appendChild(canvas);
+        edaResult.appendChild(section);
+        return canvas.getContext("2d");
+    }
+
+    // Line chart of one or more {x, y, color, label} series sharing the axes
+    function drawLineChart(ctx, lines) {
+        const { width, height } = ctx.canvas;
+        const pad = { left: 70, right: 20, top: 30, bottom: 40 };
+        const xs = lines.flatMap(line => line.x);
+        const ys = lines.flatMap(line => line.y);
+        const xMin = Math.min(...xs), xMax = Math.max(...xs);
+        const yMin = Math.min(...ys), yMax = Math.max(...ys);
+        const sx = x => pad.left + (x - xMin) / ((xMax - xMin) || 1) * (width - pad.left - pad.right);
+        const sy = y => height - pad.bottom - (y - yMin) / ((yMax - yMin) || 1) * (height - pad.top - pad.bottom);
+
+        // Axes and min/max labels
+        ctx.strokeStyle = "#999";
+        ctx.strokeRect(pad.left, pad.top, width - pad.left - pad.right, height - pad.top - pad.bottom);
+        ctx.fillStyle = "#333";
+        ctx.font = "12px sans-serif";
+        ctx.fillText(yMax.toFixed(2), 5, pad.top + 5);
+        ctx.fillText(yMin.toFixed(2), 5, height - pad.bottom);
+        ctx.fillText(new Date(xMin).toLocaleString(), pad.left, height - 15);
+        const end = new Date(xMax).toLocaleString();
+        ctx.fillText(end, width - pad.right - ctx.measureText(end).width, height - 15);
+
+        lines.forEach((line, i) => {
+            ctx.strokeStyle = line.color;
+            ctx.lineWidth = 1.5;
+            ctx.beginPath();
+            line.x.forEach((x, j) => j ? ctx.lineTo(sx(x), sy(line.y[j])) : ctx.moveTo(sx(x), sy(line.y[j])));
+            ctx.stroke();
+            ctx.fillStyle = line.color;
+            ctx.fillText(line.label, pad.left + 10 + i * 200, pad.top - 10);
+        });
+    }
+
+    // Heatmap of a pivot table {index, columns, values}, blue (low) to red (high)
+    function drawHeatmap(ctx, heatmap) {
+        const { width, height } = ctx.canvas;
+        const pad = { left: 90, right: 20, top: 20, bottom: 40 };
+        const values = heatmap.values.flat().filter(v => v !== null);
+        const vMin = Math.min(...values), vMax = Math.max(...values);
+        const cw = (width - pad.left - pad.right) / heatmap.columns.length;
+        const ch = (height - pad.top - pad.bottom) / heatmap.index.length;
+
+        ctx.font = "11px sans-serif";
+        heatmap.values.forEach((row, r) => {
+            row.forEach((v, c) => {
+                const t = v === null ? null : (v - vMin) / ((vMax - vMin) || 1);
+                ctx.fillStyle = t === null ? "#eee" : `rgb(${Math.round(255 * t)}, 80, ${Math.round(255 * (1 - t))})`;
+                ctx.fillRect(pad.left + c * cw, pad.top + r * ch, cw - 1, ch - 1);
+            });
+            ctx.fillStyle = "#333";
+            ctx.fillText(heatmap.index[r], 5, pad.top + r * ch + ch / 2 + 4);
+        });
+        heatmap.columns.forEach((label, c) => {
+            ctx.fillText(label, pad.left + c * cw + 2, height - 15);
+        });
+        ctx.fillText(`${vMin.toFixed(2)} – ${vMax.toFixed(2)}`, width - 150, height - 2);
+    }
+
+    function renderDataCharts(data) {
+        const series = data.time_series;
+        const note = document.createElement("p");
+        note.textContent = `${data.rows} rows, drawn from ${series.x.length} points.`;
+        edaResult.appendChild(note);
+
+        drawLineChart(addCanvasSection("Time Series Plot"),
+            [{ ...series, color: "blue", label: data.dependent_col }]);
+
+        renderSeasonality(data.seasonality);
+        if (data.trend_seasonality) {
+            const components = data.trend_seasonality;
+            drawLineChart(addCanvasSection("Trend Component", 200), [{ ...components.trend, color: "green", label: "Trend" }]);
+            drawLineChart(addCanvasSection("Seasonality Component", 200), [{ ...components.seasonal, color: "purple", label: "Seasonality" }]);
+            drawLineChart(addCanvasSection("Cyclic Component", 200), [{ ...components.resid, color: "orange", label: "Cyclic Component" }]);
+        }
+
+        drawLineChart(addCanvasSection("Moving Average"), [
+            { ...series, color: "blue", label: data.dependent_col },
+            { ...data.moving_avg, color: "red", label: `Moving Avg (${data.moving_avg.window} Points)` },
+        ]);
+
+        if (data.heatmap) {
+            drawHeatmap(addCanvasSection("Heatmap", 400), data.heatmap);
+        }
+
+        renderAdf(data.adf_test);
+    }
+
     edaForm.addEventListener("submit", function (e) {
         e.preventDefault(); // Prevent page reload
 
@@ -25,15 +153,8 @@ document.addEventListener('DOMContentLoaded', () => {
         // Clear previous results and show loading message
         edaResult.innerHTML = "<p>Running EDA analysis...</p>";
 
-        fetch("/eda", {
-            method: "POST",
-            headers: { "Content-Type": "application/x-www-form-urlencoded" },
-            body: params.toString()
-        })
-        .then(response => {
-            if (!response.ok) throw new Error(`HTTP error! Status: ${response.status}`);
-            return response.json(); // Expect JSON response
-        })
+        // EDA rendering is slow on large datasets; poll the job instead of blocking
+        runJob("/eda", params)
         .then(data => {
             console.log("EDA Response:", data);
 
@@ -46,6 +167,12 @@ document.addEventListener('DOMContentLoaded', () => {
                 return;
             }
 
+            // Data mode: draw the downsampled arrays on canvases
+            if (data.mode === "data") {
+                renderDataCharts(data);
+                return;
+            }
+
             // Dynamically render available plots
             const plotTitles = {
                 "time_series": "Time Series Plot",
@@ -66,15 +193,17 @@ document.addEventListener('DOMContentLoaded', () => {
                 }
             }
 
-            // Handle ADF test result (if present)
-            if (data.adf_test) {
-                const adfSection = document.createElement("div");
-                adfSection.innerHTML = `
-                    <h3>Stationarity Test (ADF)</h3>
-                    <p><strong>p-value:</strong> ${data.adf_test.p_value}</p>
-                    <p><strong>Conclusion:</strong> ${data.adf_test.stationarity}</p>
-                `;
-                edaResult.appendChild(adfSection);
+            renderSeasonality(data.seasonality);
+            renderAdf(data.adf_test);
+
+            // Server-side latency per plot type (seconds)
+            if (data.timings) {
+                const parts = Object.entries(data.timings)
+                    .filter(([name]) => name !== "total" && name !== "cached")
+                    .map(([name, seconds]) => `${name} ${seconds.toFixed(2)}s`);
+                const note = document.createElement("p");
+                note.innerHTML = `<small>${data.timings.cached ? "Cached result" : "Generated"} in ${data.timings.total.toFixed(2)}s${parts.length ? ` (${parts.join(", ")})` : ""}</small>`;
+                edaResult.appendChild(note);
             }
 
             // If nothing found
@@ -23,12 +23,8 @@ document.addEventListener('DOMContentLoaded', () => {
 
         evaluateResult.innerHTML = "<p>Evaluating models...</p>";
 
-        fetch("/evaluate", {
-            method: "POST",
-            headers: { "Content-Type": "application/x-www-form-urlencoded" },
-            body: params.toString()
-        })
-            .then(response => response.json())
+        // Evaluation fits every model, so it is submitted as a job (see jobs.js)
+        runJob("/evaluate", params)
             .then(data => {
                 console.log("Model Evaluation Response:", data);
                 evaluateResult.innerHTML = ""; // Clear previous content
@@ -37,6 +33,11 @@ document.addEventListener('DOMContentLoaded', () => {
                 title.innerText = "Model Ranking & Evaluation";
                 evaluateResult.appendChild(title);
 
+                if (data.error) {
+                    evaluateResult.innerHTML += `<p style="color:red;">Error: ${data.error}</p>`;
+                    return;
+                }
+
                 const rankedModels = data.ranked_models;
 
                 // Handle empty or missing results
@@ -70,6 +71,7 @@ document.addEventListener('DOMContentLoaded', () => {
                             <li><strong>MAE:</strong> ${metrics.MAE.toFixed(4)}</li>
                             <li><strong>RMSE:</strong> ${metrics.RMSE.toFixed(4)}</li>
                             <li><strong>MAPE:</strong> ${(metrics.MAPE * 100).toFixed(2)}%</li>
+                            <li><strong>Backtest folds:</strong> ${metrics.folds}</li>
                         `;
                         li.appendChild(metricsList);
                     }
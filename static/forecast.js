@@ -50,13 +50,13 @@ document.addEventListener('DOMContentLoaded', () => {
             return;
         }
 
+        forecastResult.innerHTML = "<p>Forecast queued...</p>";
+
         try {
-            const response = await fetch("/forecast", {
-                method: "POST",
-                body: formData,
+            // Runs as a background job; poll for the result instead of holding the request open
+            const data = await runJob("/forecast", formData, status => {
+                if (status === "running") forecastResult.innerHTML = "<p>Fitting models...</p>";
             });
-
-            const data = await response.json();
             console.log("Response Data:", data);
 
             if (data.error) {
@@ -73,13 +73,29 @@ document.addEventListener('DOMContentLoaded', () => {
     function displayForecastTable(forecastData) {
     forecastResult.innerHTML = "";
 
+    // Per-model wall time (seconds) reported by the server
+    const timings = forecastData.timings || {};
+
+    // Searched ARIMA/SARIMA orders, when order search was requested
+    const orders = forecastData.orders || {};
+
     for (const model in forecastData) {
+        if (model === "timings" || model === "orders" || model === "seasonal_order") continue;
+
         const modelData = forecastData[model];
+        const timing = timings[model] !== undefined ? ` <small>(${timings[model].toFixed(2)}s)</small>` : "";
+        const searched = orders[model] && orders[model].order;
+        const season = model === "SARIMA" && forecastData.seasonal_order
+            ? ` <small>season ${forecastData.seasonal_order[3]}</small>`
+            : "";
+        const order = searched
+            ? ` <small>order (${searched.join(",")})${orders[model].seasonal_order ? `(${orders[model].seasonal_order.join(",")})` : ""}</small>`
+            : season;
 
         if (!modelData || !Array.isArray(modelData)) {
             forecastResult.innerHTML += `
                 <div class="forecast-model result-card">
-                    <h3>🔹 ${model}</h3>
+                    <h3>🔹 ${model}${timing}</h3>
                     <p class="error">❌ Invalid forecast data.</p>
                 </div>`;
             continue;
@@ -87,7 +103,7 @@ document.addEventListener('DOMContentLoaded', () => {
 
         let tableHTML = `
             <div class="forecast-model result-card">
-                <h3>🔹 ${model}</h3>
+                <h3>🔹 ${model}${order}${timing}</h3>
                 <table class="forecast-table">
                     <thead>
                         <tr>
@@ -0,0 +1,26 @@
+// Submit a long-running request as a background job and poll until it finishes.
+// Resolves with the job result; rejects if submission or the job itself fails.
+async function runJob(url, body, onStatus) {
+    body.append("async", "1");
+
+    const response = await fetch(url, { method: "POST", body: body });
+    const submitted = await response.json();
+    if (!response.ok || submitted.error) {
+        throw new Error(submitted.error || `HTTP error! Status: ${response.status}`);
+    }
+
+    let delay = 500;
+    while (true) {
+        await new Promise(resolve => setTimeout(resolve, delay));
+
+        const statusResponse = await fetch(`/jobs/${submitted.job_id}`);
+        const job = await statusResponse.json();
+        if (!statusResponse.ok) throw new Error(job.error || `HTTP error! Status: ${statusResponse.status}`);
+
+        if (onStatus) onStatus(job.status);
+        if (job.status === "done") return job.result;
+        if (job.status === "failed") throw new Error(job.error);
+
+        delay = Math.min(delay * 1.5, 3000);  // Back off for long jobs
+    }
+}
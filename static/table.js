@@ -2,61 +2,125 @@ document.addEventListener('DOMContentLoaded', () => {
     const datasetName = new URLSearchParams(window.location.search).get('dataset_name');
     const tableResult = document.getElementById('table-result');
     const datasetNameSpan = document.getElementById('dataset-name');
+    const prevBtn = document.getElementById('prev-page');
+    const nextBtn = document.getElementById('next-page');
+    const pageInfo = document.getElementById('page-info');
+    const filterForm = document.getElementById('table-filters');
+    const exportCsv = document.getElementById('export-csv');
+    const exportNdjson = document.getElementById('export-ndjson');
+
+    const PAGE_SIZE = 100;
+
+    // Keyset pagination: cursors[i] is the `after` value that loads page i
+    let cursors = [null];
+    let page = 0;
+    let nextAfter = null;
 
     // Display dataset name in header
     if (datasetNameSpan) datasetNameSpan.innerText = datasetName;
 
     console.log(`Loading dataset: ${datasetName}`);
 
-    // Fetch JSON dataset properly
-    fetch(`/api/get_dataset?dataset_name=${datasetName}`) // Correct API endpoint
-        .then(response => {
-            if (!response.ok) throw new Error(`Failed to load dataset. Status: ${response.status}`);
-            return response.json(); // Expect JSON
-        })
-        .then(data => {
-            console.log("Dataset Loaded Successfully:", data);
+    function filterParams() {
+        const params = new URLSearchParams({ dataset_name: datasetName });
+        new FormData(filterForm).forEach((value, key) => {
+            if (value) params.set(key, value);
+        });
+        return params;
+    }
 
-            const { keys, rows } = data;
+    function updateExportLinks() {
+        ['csv', 'ndjson'].forEach(format => {
+            const params = filterParams();
+            params.set('format', format);
+            (format === 'csv' ? exportCsv : exportNdjson).href = `/api/get_dataset?${params}`;
+        });
+    }
 
-            if (!keys.length || !rows.length) {
-                tableResult.innerHTML = "<p>No data found for this dataset.</p>";
-                return;
-            }
+    function renderTable(keys, rows) {
+        // Dynamically create table
+        const table = document.createElement('table');
 
-            // Dynamically create table
-            const table = document.createElement('table');
+        // Create header
+        const thead = document.createElement('thead');
+        const headerRow = document.createElement('tr');
+        keys.forEach(key => {
+            const th = document.createElement('th');
+            th.textContent = key;
+            headerRow.appendChild(th);
+        });
+        thead.appendChild(headerRow);
+        table.appendChild(thead);
 
-            // Create header
-            const thead = document.createElement('thead');
-            const headerRow = document.createElement('tr');
+        // Create body
+        const tbody = document.createElement('tbody');
+        rows.forEach(row => {
+            const tr = document.createElement('tr');
             keys.forEach(key => {
-                const th = document.createElement('th');
-                th.textContent = key;
-                headerRow.appendChild(th);
-            });
-            thead.appendChild(headerRow);
-            table.appendChild(thead);
-
-            // Create body
-            const tbody = document.createElement('tbody');
-            rows.forEach(row => {
-                const tr = document.createElement('tr');
-                keys.forEach(key => {
-                    const td = document.createElement('td');
-                    td.textContent = row[key] !== undefined ? row[key] : '';
-                    tr.appendChild(td);
-                });
-                tbody.appendChild(tr);
+                const td = document.createElement('td');
+                td.textContent = row[key] !== undefined && row[key] !== null ? row[key] : '';
+                tr.appendChild(td);
             });
-            table.appendChild(tbody);
-
-            // Render table
-            tableResult.innerHTML = "";
-            tableResult.appendChild(table);
-        })
-        .catch(error => {
-            console.error("Error loading dataset table:", error);
-            tableResult.innerHTML = `<p style="color: red;">Failed to load dataset: ${error.message}</p>`;
+            tbody.appendChild(tr);
         });
+        table.appendChild(tbody);
+
+        // Render table
+        tableResult.innerHTML = "";
+        tableResult.appendChild(table);
+    }
+
+    function loadPage() {
+        const params = filterParams();
+        params.set('limit', PAGE_SIZE);
+        if (cursors[page]) params.set('after', cursors[page]);
+
+        fetch(`/api/get_dataset?${params}`)
+            .then(response => {
+                if (!response.ok) throw new Error(`Failed to load dataset. Status: ${response.status}`);
+                return response.json(); // Expect JSON
+            })
+            .then(data => {
+                const { keys, rows } = data;
+                nextAfter = data.next_after;
+
+                prevBtn.disabled = page === 0;
+                nextBtn.disabled = !nextAfter;
+                pageInfo.textContent = `Page ${page + 1}`;
+
+                if (!keys.length || !rows.length) {
+                    tableResult.innerHTML = "<p>No data found for this dataset.</p>";
+                    return;
+                }
+                renderTable(keys, rows);
+            })
+            .catch(error => {
+                console.error("Error loading dataset table:", error);
+                tableResult.innerHTML = `<p style="color: red;">Failed to load dataset: ${error.message}</p>`;
+            });
+    }
+
+    prevBtn.addEventListener('click', () => {
+        if (page === 0) return;
+        page -= 1;
+        loadPage();
+    });
+
+    nextBtn.addEventListener('click', () => {
+        if (!nextAfter) return;
+        page += 1;
+        cursors[page] = nextAfter;
+        loadPage();
+    });
+
+    filterForm.addEventListener('submit', event => {
+        event.preventDefault();
+        cursors = [null];
+        page = 0;
+        updateExportLinks();
+        loadPage();
+    });
+
+    updateExportLinks();
+    loadPage();
 });
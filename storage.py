@@ -0,0 +1,798 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from urllib.request import pathname2url
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+DATABASE_NAME = "data_storage.db"
+BUSY_TIMEOUT = 30  # Seconds a connection waits for another writer before "database is locked"
+CACHE_SIZE_KIB = 64 * 1024  # Page cache per connection
+MMAP_SIZE = 256 * 1024 * 1024  # Bytes of the database file memory-mapped for reads
+SYNCHRONOUS = "NORMAL"  # With WAL, commits are durable once checkpointed and never corrupt the file
+POOL_CONNECTIONS = os.environ.get("DB_POOL_CONNECTIONS", "true").lower() in ("1", "true", "yes")
+LEGACY_TABLE = "timeseries_data"  # Old layout: one JSON blob per row
+BATCH_SIZE = 50000  # Rows per executemany() call during ingest
+KEY_CHUNK = 500  # Timestamps per IN (...) lookup; below SQLite's default limit of 999 parameters
+READ_CHUNK_SIZE = 10000  # Rows fetched per step by read_arrays(); bounds the transient row tuples
+CALENDAR_LAYOUTS = {  # Precomputed heatmap grids: layout -> (row unit, column unit)
+    "hour_weekday": ("hour", "weekday"),
+    "week_month": ("week", "month"),
+    "hour_month": ("hour", "month"),
+}
+ROLLUP_RESOLUTIONS = ("hour", "day", "week")  # Time buckets maintained on every write; weeks start on Monday
+ROLLUP_AGGREGATES = {  # Aggregate name -> SQL expression over the rollups table
+    "open": "open", "high": "high", "low": "low", "close": "close",
+    "mean": "total / count", "sum": "total", "count": "count",
+}
+ROLLUP_DEFAULT_AGGREGATE = "mean"
+CATALOG_FIELDS = (
+    "id", "dataset_name", "keys", "columns", "row_count",
+    "min_timestamp", "max_timestamp", "version", "updated_at",
+)
+
+
+# ---------------------- CONNECTIONS ----------------------
+_local = threading.local()  # Per-thread idle connections: (path, read_only) -> connection
+_initialized = set()  # Database paths whose schema this process has created/migrated
+_init_lock = threading.Lock()
+
+
+def _configure(conn, read_only=False):
+    conn.execute(f"PRAGMA cache_size = -{int(CACHE_SIZE_KIB)}")
+    conn.execute(f"PRAGMA mmap_size = {int(MMAP_SIZE)}")
+    conn.execute(f"PRAGMA synchronous = {SYNCHRONOUS}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    if read_only:
+        conn.execute("PRAGMA query_only = ON")
+    return conn
+
+
+def _open(path, read_only=False):
+    """
+    New configured connection to the database at path. The first connection of the
+    process (or after the file disappears) switches the file to WAL and creates or
+    migrates the schema, so later read-only connections find it in place.
+    """
+    conn = None
+    if path not in _initialized or not os.path.exists(path):
+        with _init_lock:
+            conn = _configure(sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False))
+            conn.execute("PRAGMA journal_mode = WAL")  # Readers no longer wait for writers, and vice versa
+            init_db(conn)
+            _initialized.add(path)
+        if read_only:
+            conn.close()
+
+    if read_only or conn is None:
+        target = f"file:{pathname2url(path)}?mode=ro" if read_only else path
+        conn = _configure(sqlite3.connect(target, timeout=BUSY_TIMEOUT, uri=read_only, check_same_thread=False),
+                          read_only)
+    metrics.inc("db_connections_opened_total", help_text="SQLite connections opened",
+                mode="read" if read_only else "write")
+    return conn
+
+
+def connect():
+    """Open a new (unpooled) connection to the dataset store, creating/migrating the schema if needed."""
+    return _open(os.path.abspath(DATABASE_NAME))
+
+
+@contextmanager
+def connection(read_only=False):
+    """
+    A connection to the dataset store from this thread's pool.
+
+    Each thread keeps one idle connection per database and mode, so repeated calls skip
+    opening and configuring SQLite; a nested use in the same thread gets a connection
+    of its own. Read-only connections (for the analytics paths) cannot write. Any
+    transaction left open is rolled back before the connection is reused.
+    """
+    path = os.path.abspath(DATABASE_NAME)
+    key = (path, read_only)
+    idle = getattr(_local, "idle", None)
+    if idle is None:
+        idle = _local.idle = {}
+
+    conn = idle.pop(key, None)
+    if conn is not None and not os.path.exists(path):  # The file was replaced or removed
+        conn.close()
+        conn = None
+    conn = conn or _open(path, read_only)
+    try:
+        yield conn
+    finally:
+        if conn.in_transaction:
+            conn.rollback()
+        if POOL_CONNECTIONS and key not in idle:
+            idle[key] = conn
+        else:
+            conn.close()
+
+
+def close_connections():
+    """Close this thread's idle pooled connections."""
+    for conn in getattr(_local, "idle", {}).values():
+        conn.close()
+    _local.idle = {}
+
+
+# ---------------------- SCHEMA ----------------------
+
+def init_db(conn):
+    """Create the dataset catalog and migrate any legacy JSON rows into typed tables."""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS datasets (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            dataset_name TEXT UNIQUE NOT NULL,
+            keys TEXT,
+            columns TEXT,
+            row_count INTEGER NOT NULL DEFAULT 0,
+            min_timestamp TEXT,
+            max_timestamp TEXT,
+            version INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS forecast_results (
+            run_id TEXT NOT NULL,
+            created_at TEXT NOT NULL,
+            dataset_name TEXT NOT NULL,
+            dependent_col TEXT NOT NULL,
+            model TEXT NOT NULL,
+            step INTEGER NOT NULL,
+            forecast REAL,
+            lower_conf_int REAL,
+            upper_conf_int REAL,
+            PRIMARY KEY (run_id, dataset_name, dependent_col, model, step)
+        )
+    """)
+    # Sum and count of each REAL column per calendar cell, maintained on every write
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS calendar_aggregates (
+            dataset_id INTEGER NOT NULL,
+            layout TEXT NOT NULL,
+            column_name TEXT NOT NULL,
+            row_key INTEGER NOT NULL,
+            col_key INTEGER NOT NULL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dataset_id, column_name, layout, row_key, col_key)
+        ) WITHOUT ROWID
+    """)
+    # OHLC, sum and count of each REAL column per hour/day/week bucket, maintained on every write
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS rollups (
+            dataset_id INTEGER NOT NULL,
+            column_name TEXT NOT NULL,
+            resolution TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            open REAL,
+            high REAL,
+            low REAL,
+            close REAL,
+            total REAL NOT NULL,
+            count INTEGER NOT NULL,
+            PRIMARY KEY (dataset_id, column_name, resolution, bucket)
+        ) WITHOUT ROWID
+    """)
+    if _table_exists(conn, LEGACY_TABLE):
+        migrate_legacy(conn)
+    conn.commit()
+
+
+def _table_exists(conn, table):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def series_table(dataset_id):
+    """Name of the per-dataset table holding the typed observations."""
+    return f"series_{int(dataset_id)}"
+
+
+def _column_type(values):
+    """REAL if every non-empty value parses as a number, TEXT otherwise."""
+    present = values.dropna()
+    numeric = pd.to_numeric(present, errors="coerce")
+    return "REAL" if numeric.notna().all() else "TEXT"
+
+
+# ---------------------- CATALOG ----------------------
+def _load_info(row):
+    if row is None:
+        return None
+    info = dict(zip(CATALOG_FIELDS, row))
+    info["keys"] = json.loads(info["keys"]) if info["keys"] else []
+    info["columns"] = json.loads(info["columns"]) if info["columns"] else []
+    return info
+
+
+def _get_info(conn, dataset_name):
+    row = conn.execute(
+        f"SELECT {', '.join(CATALOG_FIELDS)} FROM datasets WHERE dataset_name = ?",
+        (dataset_name,),
+    ).fetchone()
+    return _load_info(row)
+
+
+def get_dataset_info(dataset_name):
+    """Catalog entry for a dataset (keys, column schema, row count, time range, version), or None."""
+    with connection(read_only=True) as conn:
+        return _get_info(conn, dataset_name)
+
+
+def get_version(dataset_name):
+    """Current data version of a dataset (bumped on every write), or None if unknown."""
+    with connection(read_only=True) as conn:
+        row = conn.execute(
+            "SELECT version FROM datasets WHERE dataset_name = ?", (dataset_name,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def latest_timestamp(dataset_name):
+    """Most recent stored timestamp of a dataset (from the catalog), or None if it is empty or unknown."""
+    with connection(read_only=True) as conn:
+        row = conn.execute(
+            "SELECT max_timestamp FROM datasets WHERE dataset_name = ?", (dataset_name,)
+        ).fetchone()
+        return row[0] if row else None
+
+
+def list_datasets():
+    """Names of all datasets in the catalog."""
+    with connection(read_only=True) as conn:
+        rows = conn.execute("SELECT dataset_name FROM datasets ORDER BY id").fetchall()
+        return [row[0] for row in rows]
+
+
+def list_catalog():
+    """Catalog entries for all datasets, without touching the series tables."""
+    with connection(read_only=True) as conn:
+        rows = conn.execute(f"SELECT {', '.join(CATALOG_FIELDS)} FROM datasets ORDER BY id").fetchall()
+        return [_load_info(row) for row in rows]
+
+
+def _ensure_dataset(conn, dataset_name, df, keys):
+    """Create the catalog entry and series table, adding any columns not seen before."""
+    info = _get_info(conn, dataset_name)
+    if info is None:
+        cursor = conn.execute(
+            "INSERT INTO datasets (dataset_name, keys, columns) VALUES (?, ?, ?)",
+            (dataset_name, json.dumps(keys), json.dumps([])),
+        )
+        # One row per timestamp: re-ingesting the same period updates rows instead of appending
+        conn.execute(
+            f"CREATE TABLE {series_table(cursor.lastrowid)} (timestamp TEXT PRIMARY KEY) WITHOUT ROWID"
+        )
+        info = _get_info(conn, dataset_name)
+
+    known = {col["name"] for col in info["columns"]}
+    table = series_table(info["id"])
+    for name in df.columns:
+        if name == "timestamp" or name in known:
+            continue
+        # Physical column names are positional so arbitrary API keys never need quoting
+        col = {"name": name, "column": f"c{len(info['columns'])}", "type": _column_type(df[name])}
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {col['column']} {col['type']}")
+        info["columns"].append(col)
+
+    merged_keys = info["keys"] + [k for k in keys if k not in info["keys"]]
+    conn.execute(
+        "UPDATE datasets SET keys = ?, columns = ? WHERE id = ?",
+        (json.dumps(merged_keys), json.dumps(info["columns"]), info["id"]),
+    )
+    info["keys"] = merged_keys
+    return info
+
+
+# ---------------------- WRITE ----------------------
+def _column_values(values, col):
+    """Column as a plain list with NULLs as None, coerced to the stored type."""
+    if col["type"] == "REAL":
+        values = pd.to_numeric(values, errors="coerce")
+    return values.astype(object).where(values.notna(), None).tolist()
+
+
+def _write(conn, dataset_name, df, keys):
+    df = df[df["timestamp"].notna() & (df["timestamp"] != "")]
+    df = df.drop_duplicates(subset="timestamp", keep="last")
+    info = _ensure_dataset(conn, dataset_name, df, keys)
+
+    columns = [col for col in info["columns"] if col["name"] in df.columns]
+    names = ["timestamp"] + [col["column"] for col in columns]
+    placeholders = ", ".join("?" for _ in names)
+    updates = ", ".join(f"{name} = excluded.{name}" for name in names[1:])
+    conflict = f"DO UPDATE SET {updates}" if updates else "DO NOTHING"
+    query = (
+        f"INSERT INTO {series_table(info['id'])} ({', '.join(names)}) VALUES ({placeholders}) "
+        f"ON CONFLICT(timestamp) {conflict}"
+    )
+
+    # Build column lists once and zip them; avoids per-row pandas overhead
+    timestamps = df["timestamp"].astype(str).tolist()
+    values = [_column_values(df[col["name"]], col) for col in columns]
+    rows = list(zip(timestamps, *values))
+
+    # Rows being overwritten leave the calendar aggregates before the new values enter
+    # They also tell how many of the timestamps are new, for the catalog row count
+    real = [(i, col) for i, col in enumerate(columns) if col["type"] == "REAL"]
+    old = _existing_rows(conn, info, [col for _, col in real], timestamps)
+    if real and rows:
+        _update_calendar(conn, info, old["timestamp"], {col["column"]: old[col["column"]] for _, col in real}, -1)
+        _update_calendar(conn, info, timestamps, {col["column"]: values[i] for i, col in real}, 1)
+
+    for start in range(0, len(rows), BATCH_SIZE):
+        conn.executemany(query, rows[start:start + BATCH_SIZE])
+
+    if real and rows:
+        _update_rollups(conn, info, timestamps)
+    _refresh_stats(conn, info, len(rows) - len(old))
+    return len(rows)
+
+
+def _existing_rows(conn, info, columns, timestamps):
+    """
+    Stored values of the given columns for those of `timestamps` that already exist,
+    looked up by primary key in chunks, so the cost follows the batch, not the table.
+    """
+    names = ["timestamp"] + [col["column"] for col in columns]
+    query = f"SELECT {', '.join(names)} FROM {series_table(info['id'])} WHERE timestamp IN "
+    found = []
+    for start in range(0, len(timestamps), KEY_CHUNK):
+        chunk = timestamps[start:start + KEY_CHUNK]
+        found += conn.execute(query + f"({', '.join('?' for _ in chunk)})", chunk).fetchall()
+    return pd.DataFrame.from_records(found, columns=names)
+
+
+def _refresh_stats(conn, info, added):
+    """Update row count (by the `added` new timestamps), time range and version in the catalog after a write."""
+    table = series_table(info["id"])
+    # Separate subqueries so each of MIN and MAX is a single primary key lookup
+    min_ts, max_ts = conn.execute(
+        f"SELECT (SELECT MIN(timestamp) FROM {table}), (SELECT MAX(timestamp) FROM {table})"
+    ).fetchone()
+    # Any write produces a new data version; caches key on it
+    conn.execute("""
+        UPDATE datasets
+        SET row_count = row_count + ?, min_timestamp = ?, max_timestamp = ?,
+            version = version + 1, updated_at = datetime('now')
+        WHERE id = ?
+    """, (added, min_ts, max_ts, info["id"]))
+
+
+def write_dataset(dataset_name, df, keys):
+    """
+    Upsert a DataFrame with a 'timestamp' column into dataset_name.
+
+    All rows are written in batches inside a single transaction; rows whose
+    timestamp already exists are updated in place. Returns the number of rows written.
+    """
+    with connection() as conn:
+        with metrics.span("db_write"):
+            conn.execute("BEGIN IMMEDIATE")  # Take the write lock up front; readers carry on under WAL
+            count = _write(conn, dataset_name, df, keys)
+            conn.commit()
+        return count
+
+
+def write_forecast_results(columns):
+    """Store a columnar batch-forecast payload under a new run id and return the id."""
+    run_id = uuid.uuid4().hex
+    names = ("dataset_name", "dependent_col", "model", "step", "forecast", "lower_conf_int", "upper_conf_int")
+    rows = zip(*(columns[name] for name in names))
+    with connection() as conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(f"""
+            INSERT INTO forecast_results (run_id, created_at, {', '.join(names)})
+            VALUES (?, datetime('now'), {', '.join('?' for _ in names)})
+        """, ((run_id,) + row for row in rows))
+        conn.commit()
+        return run_id
+
+
+# ---------------------- CALENDAR AGGREGATES ----------------------
+def _calendar_codes(timestamps):
+    """Row and column keys of every calendar layout for each timestamp (-1 where unparseable)."""
+    ts = pd.DatetimeIndex(pd.to_datetime(pd.Series(timestamps, dtype=object), errors="coerce"))
+    valid = ~ts.isna()
+    units = {
+        "hour": ts.hour.to_numpy(dtype=float),
+        "weekday": ts.dayofweek.to_numpy(dtype=float),
+        "week": ts.isocalendar().week.to_numpy(dtype=float),
+        "month": ts.month.to_numpy(dtype=float),
+    }
+    units = {name: np.where(valid, np.nan_to_num(unit, nan=-1), -1).astype(np.int64) for name, unit in units.items()}
+    return {layout: (units[r], units[c]) for layout, (r, c) in CALENDAR_LAYOUTS.items()}
+
+
+def _update_calendar(conn, info, timestamps, columns, sign):
+    """Add (sign=1) or remove (sign=-1) rows' values to the dataset's calendar sums and counts."""
+    if len(timestamps) == 0:
+        return
+    codes = _calendar_codes(list(timestamps))
+    deltas = []
+    for column_name, values in columns.items():
+        values = np.asarray(pd.to_numeric(pd.Series(list(values), dtype=object), errors="coerce"), dtype=float)
+        for layout, (row_keys, col_keys) in codes.items():
+            mask = ~np.isnan(values) & (row_keys >= 0)
+            if not mask.any():
+                continue
+            # One bincount per layout: cells are row_key * width + col_key
+            width = int(col_keys.max()) + 1
+            cells = row_keys[mask] * width + col_keys[mask]
+            totals = np.bincount(cells, weights=values[mask])
+            counts = np.bincount(cells)
+            for cell in np.flatnonzero(counts):
+                deltas.append((
+                    info["id"], layout, column_name, int(cell // width), int(cell % width),
+                    sign * float(totals[cell]), sign * int(counts[cell]),
+                ))
+
+    conn.executemany("""
+        INSERT INTO calendar_aggregates (dataset_id, layout, column_name, row_key, col_key, total, count)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(dataset_id, column_name, layout, row_key, col_key)
+        DO UPDATE SET total = total + excluded.total, count = count + excluded.count
+    """, deltas)
+
+
+def rebuild_calendar(conn, info, chunksize=BATCH_SIZE):
+    """Recompute a dataset's calendar aggregates from its stored rows (for data written before they existed)."""
+    conn.execute("DELETE FROM calendar_aggregates WHERE dataset_id = ?", (info["id"],))
+    real = [col["column"] for col in info["columns"] if col["type"] == "REAL"]
+    if not real:
+        return
+    chunks = pd.read_sql_query(
+        f"SELECT timestamp, {', '.join(real)} FROM {series_table(info['id'])}", conn, chunksize=chunksize,
+    )
+    for chunk in chunks:
+        _update_calendar(conn, info, chunk["timestamp"], {name: chunk[name] for name in real}, 1)
+
+
+def read_calendar(dataset_name, column, layout):
+    """
+    Mean of a REAL column per calendar cell as a DataFrame (row keys x column keys),
+    read from the precomputed aggregates. Returns None if the dataset, column or
+    layout is unknown or the column is not numeric.
+    """
+    if layout not in CALENDAR_LAYOUTS:
+        return None
+    info, col = _numeric_column(dataset_name, column, "calendar_aggregates", rebuild_calendar)
+    if col is None:
+        return None
+
+    with connection(read_only=True) as conn:
+        cells = pd.read_sql_query("""
+            SELECT row_key, col_key, total / count AS mean FROM calendar_aggregates
+            WHERE dataset_id = ? AND column_name = ? AND layout = ? AND count > 0
+        """, conn, params=(info["id"], col["column"], layout))
+    return cells.pivot(index="row_key", columns="col_key", values="mean")
+
+
+def _numeric_column(dataset_name, column, table, rebuild):
+    """
+    (catalog entry, column entry) of a REAL column, or (info, None). If `table` has no
+    rows for the dataset yet they are backfilled with rebuild(conn, info) on a write connection.
+    """
+    with connection(read_only=True) as conn:
+        info = _get_info(conn, dataset_name)
+        col = next((c for c in info["columns"] if c["name"] == column), None) if info else None
+        if col is None or col["type"] != "REAL":
+            return info, None
+        has_rows = conn.execute(f"SELECT 1 FROM {table} WHERE dataset_id = ? LIMIT 1", (info["id"],)).fetchone()
+
+    if not has_rows and info["row_count"]:
+        with connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            if not conn.execute(f"SELECT 1 FROM {table} WHERE dataset_id = ? LIMIT 1", (info["id"],)).fetchone():
+                rebuild(conn, _get_info(conn, dataset_name))
+            conn.commit()
+    return info, col
+
+
+# ---------------------- ROLLUPS ----------------------
+def _bucket_starts(timestamps, resolution):
+    """Start of the hour, day or (Monday-based) week containing each datetime64 timestamp."""
+    if resolution == "hour":
+        return timestamps.astype("datetime64[h]").astype("datetime64[s]")
+    days = timestamps.astype("datetime64[D]")
+    if resolution == "week":
+        days = days - (days.astype(np.int64) + 3) % 7  # 1970-01-01 was a Thursday
+    return days.astype("datetime64[s]")
+
+
+def _bucket_text(buckets):
+    return np.char.replace(np.datetime_as_string(buckets, unit="s"), "T", " ")
+
+
+def _rollup_rows(info, columns, stamps, values):
+    """Rollup table rows for every bucket of the given rows (stamps sorted, values per column)."""
+    rows = []
+    for col in columns:
+        column_values = values[col["column"]]
+        keep = ~np.isnat(stamps) & ~np.isnan(column_values)
+        if not keep.any():
+            continue
+        v = column_values[keep]
+        for resolution in ROLLUP_RESOLUTIONS:
+            buckets = _bucket_starts(stamps[keep], resolution)
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            ends = np.r_[starts[1:], len(v)]
+            aggregates = zip(
+                _bucket_text(buckets[starts]), v[starts], np.maximum.reduceat(v, starts),
+                np.minimum.reduceat(v, starts), v[ends - 1], np.add.reduceat(v, starts), ends - starts,
+            )
+            rows.extend(
+                (info["id"], col["column"], resolution, bucket, float(o), float(h), float(l), float(c), float(t), int(n))
+                for bucket, o, h, l, c, t, n in aggregates
+            )
+    return rows
+
+
+def _refresh_rollups(conn, info, weeks):
+    """
+    Recompute every rollup bucket inside the given weeks from the stored rows.
+
+    Weeks are aligned with days and hours, so each week is rebuilt from one range
+    read of the series table. Min/max cannot be updated by deltas when rows are
+    overwritten, so affected buckets are recomputed rather than adjusted.
+    """
+    real = [col for col in info["columns"] if col["type"] == "REAL"]
+    if not real:
+        return
+    table = series_table(info["id"])
+    select = ", ".join(["timestamp"] + [col["column"] for col in real])
+
+    for week in weeks:
+        # Day-granular bounds compare correctly against any stored time-of-day format
+        lo, hi = str(week), str(week + np.timedelta64(7, "D"))
+        stored = conn.execute(
+            f"SELECT {select} FROM {table} WHERE timestamp >= ? AND timestamp < ?", (lo, hi)
+        ).fetchall()
+        for col in real:
+            for resolution in ROLLUP_RESOLUTIONS:
+                conn.execute(
+                    "DELETE FROM rollups WHERE dataset_id = ? AND column_name = ? AND resolution = ? "
+                    "AND bucket >= ? AND bucket < ?",
+                    (info["id"], col["column"], resolution, lo, hi),
+                )
+        if not stored:
+            continue
+
+        stamps = parse_timestamps([row[0] for row in stored])
+        order = np.argsort(stamps, kind="stable")
+        values = {
+            col["column"]: np.array([row[i] for row in stored], dtype=float)[order]
+            for i, col in enumerate(real, start=1)
+        }
+        conn.executemany(
+            "INSERT OR REPLACE INTO rollups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            _rollup_rows(info, real, stamps[order], values),
+        )
+
+
+def _update_rollups(conn, info, timestamps):
+    """Rebuild the rollup buckets touched by newly written timestamps."""
+    stamps = parse_timestamps(timestamps)
+    stamps = stamps[~np.isnat(stamps)]
+    if len(stamps):
+        weeks = np.unique(_bucket_starts(stamps, "week").astype("datetime64[D]"))
+        _refresh_rollups(conn, info, weeks)
+
+
+def rebuild_rollups(conn, info):
+    """Recompute all of a dataset's rollups (for data written before they existed)."""
+    conn.execute("DELETE FROM rollups WHERE dataset_id = ?", (info["id"],))
+    if not info["row_count"]:
+        return
+    stamps = parse_timestamps([info["min_timestamp"], info["max_timestamp"]])
+    if np.isnat(stamps).any():
+        return
+    first, last = _bucket_starts(stamps, "week").astype("datetime64[D]")
+    _refresh_rollups(conn, info, np.arange(first, last + np.timedelta64(1, "D"), 7))
+
+
+def read_rollup(dataset_name, column, resolution, aggregate=ROLLUP_DEFAULT_AGGREGATE):
+    """
+    One aggregate of a REAL column per hour/day/week bucket, in time order, read
+    from the rollups maintained on write. Returns (bucket starts as datetime64[ns],
+    float values), or (None, None) if the dataset or column is unknown or not numeric.
+    """
+    if resolution not in ROLLUP_RESOLUTIONS or aggregate not in ROLLUP_AGGREGATES:
+        raise ValueError(f"Unknown resolution '{resolution}' or aggregate '{aggregate}'.")
+    info, col = _numeric_column(dataset_name, column, "rollups", rebuild_rollups)
+    if col is None:
+        return None, None
+
+    with connection(read_only=True) as conn, metrics.span("db_read"):
+        rows = conn.execute(f"""
+            SELECT bucket, {ROLLUP_AGGREGATES[aggregate]} FROM rollups
+            WHERE dataset_id = ? AND column_name = ? AND resolution = ?
+            ORDER BY bucket
+        """, (info["id"], col["column"], resolution)).fetchall()
+    timestamps = parse_timestamps([row[0] for row in rows])
+    values = np.array([row[1] for row in rows], dtype=float)
+    return timestamps, values
+
+
+# ---------------------- READ ----------------------
+def parse_timestamps(values):
+    """
+    Stored timestamp strings as datetime64[ns] in one vectorized pass.
+
+    ISO 8601 strings (what the APIs deliver) take pandas' fast path; anything else
+    falls back to per-value inference, and unparseable values become NaT. Values
+    with a UTC offset are converted to naive UTC.
+    """
+    values = np.asarray(values, dtype=object)
+    try:
+        parsed = pd.to_datetime(values, format="ISO8601", errors="coerce")
+    except ValueError:  # Mixed UTC offsets
+        parsed = pd.to_datetime(values, format="ISO8601", errors="coerce", utc=True)
+    if getattr(parsed, "tz", None) is not None:
+        parsed = parsed.tz_convert(None)
+    parsed = parsed.to_numpy(dtype="datetime64[ns]")
+
+    missing = np.isnat(parsed)
+    retry = missing & pd.notna(values) if missing.any() else missing
+    if retry.any():
+        fallback = pd.to_datetime(values[retry], format="mixed", errors="coerce", utc=True).tz_convert(None)
+        parsed[retry] = fallback.to_numpy(dtype="datetime64[ns]")
+    return parsed
+
+
+def read_arrays(dataset_name, columns=None, last=None, dtype=np.float64, chunksize=READ_CHUNK_SIZE):
+    """
+    Timestamps and value columns of a dataset as contiguous NumPy arrays.
+
+    Only the requested columns are selected in SQLite, and rows are fetched `chunksize`
+    at a time into preallocated arrays: REAL columns as `dtype` (float64 or float32),
+    TEXT columns as object arrays, and timestamps parsed chunk by chunk into
+    datetime64[ns]. Peak memory is the result plus one chunk of rows. `last` limits
+    the result to the most recent rows. Returns (timestamps, {name: array}), or
+    (None, None) if the dataset does not exist.
+    """
+    with connection(read_only=True) as conn:
+        conn.execute("BEGIN")  # Row count and rows come from the same snapshot
+        info = _get_info(conn, dataset_name)
+        if info is None:
+            return None, None
+
+        selected = _projection(info, columns)
+        select = ", ".join(["timestamp"] + [col["column"] for col in selected])
+        table = series_table(info["id"])
+        n = info["row_count"] if last is None else min(int(last), info["row_count"])
+
+        timestamps = np.empty(n, dtype="datetime64[ns]")
+        arrays = {
+            col["name"]: np.empty(n, dtype=dtype if col["type"] == "REAL" else object) for col in selected
+        }
+
+        if last is None:
+            cursor = conn.execute(f"SELECT {select} FROM {table} ORDER BY timestamp")
+        else:
+            cursor = conn.execute(
+                f"SELECT * FROM (SELECT {select} FROM {table} ORDER BY timestamp DESC LIMIT ?) ORDER BY timestamp",
+                (int(last),),
+            )
+
+        # The catalog count only sizes the arrays; the query decides how many rows there are
+        filled, parse_seconds = 0, 0.0
+        with metrics.span("db_read"):
+            while True:
+                rows = cursor.fetchmany(chunksize)
+                if not rows:
+                    break
+                end = filled + len(rows)
+                if end > len(timestamps):
+                    size = max(end, 2 * len(timestamps))
+                    timestamps = np.resize(timestamps, size)
+                    arrays = {name: np.resize(values, size) for name, values in arrays.items()}
+                started = time.perf_counter()
+                timestamps[filled:end] = parse_timestamps([row[0] for row in rows])
+                parse_seconds += time.perf_counter() - started
+                for i, col in enumerate(selected, start=1):
+                    arrays[col["name"]][filled:end] = [row[i] for row in rows]
+                filled = end
+        metrics.record([("parse", {}, parse_seconds)])
+
+        if filled != n:
+            logging.warning(
+                f"Catalog row count of '{dataset_name}' ({info['row_count']}) does not match its table; "
+                f"read {filled} rows."
+            )
+        if filled != len(timestamps):
+            timestamps = timestamps[:filled]
+            arrays = {name: values[:filled] for name, values in arrays.items()}
+        return timestamps, arrays
+
+
+def _projection(info, columns):
+    return [col for col in info["columns"] if columns is None or col["name"] in columns]
+
+
+def projected_columns(info, columns=None):
+    """Output column names (timestamp first) for a projection of a dataset."""
+    return ["timestamp"] + [col["name"] for col in _projection(info, columns)]
+
+
+def iter_chunks(dataset_name, columns=None, start=None, end=None, after=None, limit=None, chunksize=10000):
+    """
+    Stream a dataset in timestamp order as lists of row tuples, `chunksize` rows at a time.
+
+    Projection and filters run in SQLite: `start`/`end` bound the timestamp range
+    (inclusive), `after` resumes strictly after a timestamp (keyset pagination) and
+    `limit` caps the total rows. Memory is bounded by one chunk, not the dataset.
+    Row tuples follow `projected_columns(info, columns)`.
+    """
+    with connection(read_only=True) as conn:
+        info = _get_info(conn, dataset_name)
+        if info is None:
+            return
+
+        select = ", ".join(["timestamp"] + [col["column"] for col in _projection(info, columns)])
+        clauses, params = [], []
+        for op, value in ((">=", start), ("<=", end), (">", after)):
+            if value is not None:
+                clauses.append(f"timestamp {op} ?")
+                params.append(str(value))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        query = f"SELECT {select} FROM {series_table(info['id'])} {where} ORDER BY timestamp"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+
+        cursor = conn.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunksize)
+            if not rows:
+                break
+            yield rows
+
+
+# ---------------------- MIGRATION ----------------------
+def migrate_legacy(conn, chunksize=50000):
+    """
+    Move rows from the legacy JSON-per-row `timeseries_data` table into typed
+    per-dataset tables, then drop the legacy table. Runs once, inside one transaction;
+    duplicate timestamps from repeated fetches collapse to the latest row.
+    """
+    names = [row[0] for row in conn.execute(f"SELECT DISTINCT dataset_name FROM {LEGACY_TABLE}")]
+    for dataset_name in names:
+        keys_row = conn.execute(
+            f"SELECT keys FROM {LEGACY_TABLE} WHERE dataset_name = ? LIMIT 1", (dataset_name,)
+        ).fetchone()
+        keys = json.loads(keys_row[0]) if keys_row and keys_row[0] else []
+
+        chunks = pd.read_sql_query(
+            f"SELECT timestamp, data FROM {LEGACY_TABLE} WHERE dataset_name = ? ORDER BY id",
+            conn, params=(dataset_name,), chunksize=chunksize,
+        )
+        total = 0
+        for chunk in chunks:
+            data = pd.DataFrame.from_records(chunk["data"].map(json.loads).tolist())
+            data.insert(0, "timestamp", chunk["timestamp"].values)
+            total += _write(conn, dataset_name, data, keys or data.columns.tolist())
+        logging.info(f"Migrated {total} rows of dataset '{dataset_name}' to typed storage.")
+
+    conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+    conn.commit()
+
+
+if __name__ == "__main__":
+    # `python storage.py` migrates an existing data_storage.db in place
+    connect().close()
+    print(f" Datasets available: {list_datasets()}")
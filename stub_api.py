@@ -0,0 +1,107 @@
+"""
+Local stand-in for the market-data API, for testing fetches without network access.
+
+Serves an Alpha Vantage style "Time Series (5min)" payload of a deterministic
+synthetic series. Each request reveals `grow` more bars, so repeated fetches see
+new data the way a live feed would. `?fail=N` makes the first N requests to a path
+answer 503, to exercise retries.
+
+    python stub_api.py --port 8765
+    curl "http://127.0.0.1:8765/query?symbol=TEST"
+"""
+import argparse
+import json
+import threading
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+# ---------------------- CONFIG ----------------------
+START = datetime(2025, 1, 1)
+INTERVAL = timedelta(minutes=5)
+INITIAL_BARS = 500  # Bars in the first response
+GROW = 5  # New bars per subsequent request
+WINDOW = 1000  # Most recent bars per response, like the API's "full" output limit
+
+
+def make_bars(n, seed=0):
+    """First n OHLCV bars of a deterministic random walk, as the API's nested dict."""
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, n))
+    open_ = np.concatenate(([100.0], close[:-1]))
+    spread = np.abs(rng.normal(0, 0.3, n))
+    volume = rng.integers(100, 10000, n)
+    return {
+        (START + INTERVAL * i).strftime("%Y-%m-%d %H:%M:%S"): {
+            "1. open": f"{open_[i]:.4f}",
+            "2. high": f"{max(open_[i], close[i]) + spread[i]:.4f}",
+            "3. low": f"{min(open_[i], close[i]) - spread[i]:.4f}",
+            "4. close": f"{close[i]:.4f}",
+            "5. volume": str(volume[i]),
+        }
+        for i in range(n)
+    }
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        symbol = query.get("symbol", ["TEST"])[0]
+
+        with server.lock:
+            calls = server.calls.get(url.path, 0) + 1
+            server.calls[url.path] = calls
+            bars = server.bars.get(symbol, server.initial_bars - server.grow) + server.grow
+            server.bars[symbol] = bars
+
+        if calls <= int(query.get("fail", [0])[0]):
+            self.send_error(503, "Simulated outage")
+            return
+
+        series = make_bars(bars, seed=sum(map(ord, symbol)))
+        recent = dict(list(series.items())[-server.window:])
+        body = json.dumps({
+            "Meta Data": {"2. Symbol": symbol, "4. Interval": "5min"},
+            "Time Series (5min)": dict(reversed(list(recent.items()))),  # Newest first, like the API
+        }).encode("utf-8")
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=0, initial_bars=INITIAL_BARS, grow=GROW, window=WINDOW):
+    server = ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+    server.lock = threading.Lock()
+    server.calls = {}
+    server.bars = {}
+    server.initial_bars, server.grow, server.window = initial_bars, grow, window
+    return server
+
+
+def start(port=0, **options):
+    """Run a stub server on a daemon thread; returns (server, base_url). Call server.shutdown() to stop."""
+    server = make_server(port, **options)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a synthetic market-data API locally.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--initial-bars", type=int, default=INITIAL_BARS)
+    parser.add_argument("--grow", type=int, default=GROW)
+    args = parser.parse_args()
+
+    server = make_server(args.port, initial_bars=args.initial_bars, grow=args.grow)
+    print(f"Stub API listening on http://127.0.0.1:{args.port}/query?symbol=TEST")
+    server.serve_forever()
@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root, next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh, empty dataset store for one test."""
+    monkeypatch.setattr(storage, "DATABASE_NAME", str(tmp_path / "test.db"))
+    yield storage.DATABASE_NAME
+    storage.close_connections()
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import backtest
+import models
+
+
+@pytest.mark.parametrize("window", ["expanding", "sliding"])
+def test_folds_train_before_their_test_window(window):
+    n, horizon = 200, 10
+    folds = backtest.make_folds(n, 5, horizon, window)
+
+    assert len(folds) == 5
+    assert folds[-1][2] + horizon == n  # The last fold ends at the end of the series
+    for (_, start, origin), (_, _, next_origin) in zip(folds, folds[1:]):
+        assert next_origin - origin == horizon  # Test windows are adjacent and do not overlap
+    for _, start, origin in folds:
+        assert 0 <= start < origin <= n - horizon
+    if window == "sliding":
+        assert len({origin - start for _, start, origin in folds}) == 1
+
+
+def test_folds_skip_origins_with_too_little_training_data():
+    folds = backtest.make_folds(backtest.MIN_TRAIN_SIZE + 15, 5, 10)
+    assert [origin for _, _, origin in folds] == [backtest.MIN_TRAIN_SIZE + 5]
+
+
+class _LastValue:
+    """Stands in for a fitted state-space model: forecasts the last training value."""
+
+    def __init__(self, train):
+        self.train = np.asarray(train)
+        self.params = None
+
+    def fit(self, **kwargs):
+        return self
+
+    def filter(self, params):
+        return self
+
+    def forecast(self, steps):
+        return np.full(steps, self.train[-1])
+
+
+def _last_value_forecast(df, dependent_col, steps, **kwargs):
+    return [{"forecast": float(df[dependent_col].iloc[-1])}] * steps
+
+
+def test_backtest_models_only_see_data_before_the_origin(monkeypatch):
+    monkeypatch.setitem(models.STATE_SPACE_MODELS, "ARIMA", (_LastValue, {}))
+    monkeypatch.setitem(models.FORECAST_MODELS, "XGBoost", _last_value_forecast)
+    # Each value is its own position, so a forecast shows the last index the model saw
+    df = pd.DataFrame({"y": np.arange(120, dtype=float)})
+
+    rows = list(backtest.iter_backtest(df, "y", folds=4, horizon=5, model_names=["ARIMA", "XGBoost"],
+                                       executor="serial", refit_every=2))
+
+    assert len(rows) == 8
+    for row in rows:
+        assert row["error"] is None
+        assert row["forecast"] == [row["origin"] - 1.0] * 5
+        assert row["actual"] == [float(i) for i in range(row["origin"], row["origin"] + 5)]
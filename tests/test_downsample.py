@@ -0,0 +1,34 @@
+import numpy as np
+
+from downsample import downsample, lttb
+
+
+def test_lttb_keeps_endpoints_and_returns_the_target_count():
+    rng = np.random.default_rng(0)
+    x = np.arange(10_000, dtype=float)
+    y = np.cumsum(rng.normal(size=len(x)))
+
+    for threshold in (3, 100, 997, 9_999):
+        idx = lttb(x, y, threshold)
+        assert len(idx) == threshold
+        assert idx[0] == 0 and idx[-1] == len(x) - 1
+        assert np.all(np.diff(idx) > 0)
+
+
+def test_lttb_keeps_short_series_whole():
+    assert lttb(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_lttb_keeps_a_spike():
+    y = np.zeros(1_000)
+    y[437] = 50.0
+    assert 437 in lttb(np.arange(len(y)), y, 50)
+
+
+def test_downsample_drops_missing_values():
+    y = np.arange(1_000, dtype=float)
+    y[::3] = np.nan
+    x, y_out = downsample(np.arange(1_000), y, 100)
+    assert len(x) == len(y_out) == 100
+    assert not np.isnan(y_out).any()
+    assert x[-1] == 998  # The last non-missing point
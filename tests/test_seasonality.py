@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+import seasonality
+
+
+def seasonal_series(n, periods, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(n)
+    values = 0.01 * t + rng.normal(0, 1, n)
+    for period, amplitude in periods:
+        values += amplitude * np.sin(2 * np.pi * t / period)
+    return values
+
+
+@pytest.mark.parametrize("period", [7, 12, 24, 288])
+def test_detects_a_synthetic_period(period):
+    periods = seasonality.detect_periods(seasonal_series(20 * period + 500, [(period, 5)]))
+    assert periods and periods[0]["period"] == period
+
+
+def test_detects_daily_and_weekly_periods_of_hourly_data():
+    periods = seasonality.detect_periods(seasonal_series(24 * 7 * 12, [(24, 5), (168, 3)]))
+    assert [p["period"] for p in periods[:2]] == [24, 168]
+
+
+def test_max_period_limits_the_result():
+    periods = seasonality.detect_periods(seasonal_series(24 * 7 * 12, [(24, 5), (168, 3)]), max_period=60)
+    assert [p["period"] for p in periods] == [24]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_random_walks_and_noise_have_no_period(seed):
+    rng = np.random.default_rng(seed)
+    assert seasonality.detect_periods(np.cumsum(rng.normal(size=3_600))) == []
+    assert seasonality.detect_periods(rng.normal(size=3_600)) == []
+
+
+def test_decomposition_recovers_the_seasonal_profile():
+    period = 24
+    values = seasonal_series(period * 30, [(period, 5)])
+    result = seasonality.decompose(values, period)
+    expected = 5 * np.sin(2 * np.pi * np.arange(period) / period)
+    assert np.abs(result["seasonal"][:period] - expected).max() < 0.5
+    assert np.isnan(result["trend"][:period // 2]).all()
+    assert not np.isnan(result["trend"][period // 2:-(period // 2)]).any()
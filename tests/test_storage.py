@@ -0,0 +1,60 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+
+import storage
+
+
+def frame(start, periods, value):
+    timestamps = pd.date_range(start, periods=periods, freq="5min").strftime("%Y-%m-%d %H:%M:%S")
+    return pd.DataFrame({"timestamp": timestamps, "value": np.full(periods, float(value))})
+
+
+def table_count(database, dataset_name):
+    info = storage.get_dataset_info(dataset_name)
+    with sqlite3.connect(database) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {storage.series_table(info['id'])}").fetchone()[0]
+
+
+def test_upsert_keeps_one_row_per_timestamp(database):
+    keys = ["timestamp", "value"]
+    assert storage.write_dataset("s", frame("2024-01-01", 100, 1), keys) == 100
+    storage.write_dataset("s", frame("2024-01-01 05:00", 100, 2), keys)  # Overlaps the last 40 rows
+    storage.write_dataset("s", frame("2024-01-01", 10, 3), keys)  # Only existing rows
+
+    info = storage.get_dataset_info("s")
+    assert info["row_count"] == 160 == table_count(database, "s")
+    assert info["min_timestamp"] == "2024-01-01 00:00:00"
+    assert info["max_timestamp"] == "2024-01-01 13:15:00"
+
+    timestamps, arrays = storage.read_arrays("s", ["value"])
+    assert len(timestamps) == len(arrays["value"]) == 160
+    assert np.all(np.diff(timestamps) > np.timedelta64(0))
+    # Later writes win: 3 for the first ten rows, 2 from the overlap on
+    assert arrays["value"][:10].tolist() == [3.0] * 10
+    assert arrays["value"][10:60].tolist() == [1.0] * 50
+    assert arrays["value"][60:].tolist() == [2.0] * 100
+
+
+def test_duplicate_timestamps_in_one_batch_count_once(database):
+    df = pd.concat([frame("2024-01-01", 20, 1), frame("2024-01-01", 5, 9)], ignore_index=True)
+    storage.write_dataset("s", df, ["timestamp", "value"])
+
+    assert storage.get_dataset_info("s")["row_count"] == 20 == table_count(database, "s")
+    _, arrays = storage.read_arrays("s", ["value"])
+    assert arrays["value"][:5].tolist() == [9.0] * 5  # The last occurrence is kept
+
+
+def test_read_arrays_last_and_catalog_drift(database):
+    storage.write_dataset("s", frame("2024-01-01", 50, 1), ["timestamp", "value"])
+
+    timestamps, _ = storage.read_arrays("s", ["value"], last=7)
+    assert len(timestamps) == 7
+    assert str(timestamps[-1]) == "2024-01-01T04:05:00.000000000"
+
+    # A catalog count that disagrees with the table does not change what is read
+    with sqlite3.connect(database) as conn:
+        conn.execute("UPDATE datasets SET row_count = 10")
+    timestamps, arrays = storage.read_arrays("s", ["value"], chunksize=8)
+    assert len(timestamps) == len(arrays["value"]) == 50